@@ -0,0 +1,59 @@
+"""Runs the benchmark suite.
+
+    python -m benchmarks                        # every benchmark at the default sizes
+    python -m benchmarks -k leaderboard --full  # only leaderboards, up to 100k entries
+    python -m benchmarks --json after.json --compare before.json
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks.bench_models import BENCHMARKS
+from benchmarks.harness import compare, dump, header, measure, row
+
+DEFAULT_SIZES = (10, 1_000, 10_000)
+FULL_SIZES = (10, 1_000, 10_000, 100_000)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks containing this")
+    parser.add_argument("--sizes", type=int, nargs="+", help="payload sizes to run at")
+    parser.add_argument("--full", action="store_true", help="include 100k entry payloads")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--compare", help="a previous --json file to check for regressions")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="the slowdown, as a fraction, reported as a regression (default: 0.1)",
+    )
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES)
+    results = []
+    header()
+    for name, setup in BENCHMARKS.items():
+        if args.keyword and args.keyword not in name:
+            continue
+        for size in sizes:
+            results.append(measure(name, size, setup, repeat=args.repeat))
+            row(results[-1])
+
+    if args.json_path:
+        dump(results, args.json_path)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Compares the JSON codecs available to :class:`~trainerdex.api.http.BaseHTTPClient`.
+
+Run with ``python -m benchmarks.bench_codec``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from benchmarks import payloads
+from trainerdex.api.http.codec import CODECS
+
+PAYLOADS = {
+    "users (10k)": lambda: payloads.users(10_000),
+    "updates (2k)": lambda: payloads.updates(2_000),
+    "leaderboard (50k)": lambda: payloads.leaderboard(50_000),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs = []
+    # The standard library goes first, as the baseline for the others
+    for codec in sorted(CODECS.values(), key=lambda codec: codec.name != "json"):
+        try:
+            codecs.append(codec())
+        except ImportError:
+            print(f"{codec.name} is not installed, skipping")
+
+    for label, factory in PAYLOADS.items():
+        body = json.dumps(factory()).encode("utf-8")
+        print(f"\n{label}: {len(body) / 1024 / 1024:.1f} MiB")
+        baseline = None
+        for codec in codecs:
+            decoded = codec.loads(body)
+            loads = min(timeit.repeat(lambda: codec.loads(body), number=1, repeat=args.repeat))
+            dumps = min(timeit.repeat(lambda: codec.dumps(decoded), number=1, repeat=args.repeat))
+            baseline = baseline or loads
+            speedup = f" ({baseline / loads:.1f}x)"
+            print(
+                f"  {codec.name:>8}: loads {loads * 1000:8.2f} ms{speedup}, "
+                f"dumps {dumps * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
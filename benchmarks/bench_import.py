@@ -0,0 +1,81 @@
+"""Checks how long importing the library takes, against a budget.
+
+Each import is timed in a fresh interpreter, so nothing is already cached in ``sys.modules``.
+Besides the time, each import must not pull in any of ``DEFERRED``, which should only be loaded
+once they're actually needed.
+
+Run with ``python -m benchmarks.bench_import``. It exits non-zero if a budget is exceeded.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Milliseconds, measured on top of interpreter start up. Most of the client's budget is asyncio.
+BUDGETS: Dict[str, float] = {
+    "trainerdex.api": 5.0,
+    "trainerdex.api.update": 60.0,
+    "trainerdex.api.leaderboard": 60.0,
+    "trainerdex.api.http": 40.0,
+    "trainerdex.api.client": 40.0,
+    "trainerdex.api.client.base": 200.0,
+}
+DEFERRED = ("aiohttp", "dateutil", "numpy", "pkg_resources", "importlib.metadata", "sqlite3")
+
+_SCRIPT = """
+import json, sys, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+print(json.dumps([elapsed, [name for name in {deferred!r} if name in sys.modules]]))
+"""
+
+
+def measure(module: str, repeat: int) -> Tuple[float, List[str]]:
+    """Returns the fastest of ``repeat`` cold imports of ``module``, in seconds, and which
+    deferred modules it loaded."""
+    timings = []
+    loaded: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _SCRIPT.format(module=module, deferred=DEFERRED)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        elapsed, loaded = json.loads(output)
+        timings.append(elapsed)
+    return min(timings), loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="multiply every budget, for slower machines (default: 1.0)",
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'module':<30} {'time':>10} {'budget':>10}")
+    for module, budget in BUDGETS.items():
+        elapsed, loaded = measure(module, args.repeat)
+        budget *= args.scale
+        status = "ok"
+        if elapsed * 1000 > budget:
+            status = "OVER BUDGET"
+        if loaded:
+            status = f"loaded {', '.join(loaded)}"
+        failures += status != "ok"
+        print(f"{module:<30} {elapsed * 1000:8.1f}ms {budget:8.1f}ms  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Benchmarks for model construction, leaderboard access and response decoding."""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from typing import Any, Callable, Dict
+
+from benchmarks import payloads
+from benchmarks.harness import Setup
+from benchmarks.legacy import LegacyUpdate
+from trainerdex.api.history import UpdateHistory
+from trainerdex.api.http.codec import get_codec
+from trainerdex.api.http.streaming import IncrementalArrayDecoder
+from trainerdex.api.leaderboard import Leaderboard
+from trainerdex.api.trainer import Trainer
+from trainerdex.api.update import STAT_FIELDS, Update
+from trainerdex.api.utils import parse_datetime
+
+
+def update_construct(size: int) -> Callable[[], Any]:
+    data = payloads.updates(size)
+    return lambda: [Update(None, update) for update in data]
+
+
+def update_construct_legacy(size: int) -> Callable[[], Any]:
+    data = payloads.updates(size)
+    return lambda: [LegacyUpdate(None, update) for update in data]
+
+
+def update_access(size: int) -> Callable[[], Any]:
+    """Reads every stat of every update."""
+    updates = [Update(None, update) for update in payloads.updates(size)]
+    return lambda: [[getattr(update, stat) for stat in STAT_FIELDS] for update in updates]
+
+
+def update_access_legacy(size: int) -> Callable[[], Any]:
+    updates = [LegacyUpdate(None, update) for update in payloads.updates(size)]
+    return lambda: [[getattr(update, stat) for stat in STAT_FIELDS] for update in updates]
+
+
+def timestamp_parse(size: int) -> Callable[[], Any]:
+    timestamps = [update["update_time"] for update in payloads.updates(size)]
+    return lambda: [parse_datetime(timestamp) for timestamp in timestamps]
+
+
+def timestamp_parse_dateutil(size: int) -> Callable[[], Any]:
+    from dateutil.parser import parse
+
+    timestamps = [update["update_time"] for update in payloads.updates(size)]
+    return lambda: [parse(timestamp) for timestamp in timestamps]
+
+
+def history_query(size: int) -> Callable[[], Any]:
+    """Builds a history, then asks for the latest XP and the XP at 100 moments."""
+    updates = [Update(None, update) for update in payloads.updates(size)]
+    moments = sorted(update.update_time for update in updates[:: max(size // 100, 1)])
+
+    def query() -> Any:
+        history = UpdateHistory(updates)
+        return history.latest_value("total_xp"), history.values_at("total_xp", moments)
+
+    return query
+
+
+def history_query_scan(size: int) -> Callable[[], Any]:
+    """The same queries as ``history.query``, scanning a list as ``Trainer`` used to."""
+    updates = [Update(None, update) for update in payloads.updates(size)]
+    moments = sorted(update.update_time for update in updates[:: max(size // 100, 1)])
+
+    def value_at(moment):
+        subset = [u for u in updates if u.total_xp is not None and u.update_time <= moment]
+        return max(subset, key=lambda u: u.update_time).total_xp if subset else None
+
+    def query() -> Any:
+        return value_at(max(u.update_time for u in updates)), [value_at(m) for m in moments]
+
+    return query
+
+
+def trainer_construct(size: int) -> Callable[[], Any]:
+    data = payloads.trainers(size)
+    return lambda: [Trainer(None, trainer) for trainer in data]
+
+
+def leaderboard_iterate(size: int) -> Callable[[], Any]:
+    data = payloads.leaderboard(size)
+    loop = asyncio.new_event_loop()
+
+    async def iterate() -> int:
+        count = 0
+        async for _ in Leaderboard(None, data):
+            count += 1
+        return count
+
+    return lambda: loop.run_until_complete(iterate())
+
+
+def leaderboard_getitem(size: int) -> Callable[[], Any]:
+    """Looks up 100 positions, spread evenly across the board."""
+    leaderboard = Leaderboard(None, payloads.leaderboard(size))
+    positions = [1 + i * size // 100 for i in range(100)]
+    return lambda: [leaderboard[position] for position in positions]
+
+
+def leaderboard_lookup(size: int) -> Callable[[], Any]:
+    """Finds 100 trainers by ID and by username, and the ranks around each."""
+    data = payloads.leaderboard(size)
+    leaderboard = Leaderboard(None, data)
+    rows = [data["leaderboard"][i * size // 100] for i in range(100)]
+
+    def lookup() -> int:
+        found = 0
+        for row in rows:
+            found += leaderboard.get_entry(row["id"]) is not None
+            found += leaderboard.get_entry_by_username(row["username"].upper()) is not None
+            found += len(leaderboard.around(row["id"], 5))
+        return found
+
+    return lookup
+
+
+def leaderboard_diff(size: int) -> Callable[[], Any]:
+    """Snapshots two leaderboards, a week apart, and finds the 10 biggest climbers."""
+    old = payloads.leaderboard(size)
+    rng = random.Random(1)
+    rows = [{**row, "value": row["value"] + rng.randrange(10**6)} for row in old["leaderboard"]]
+    rows.sort(key=lambda row: -row["value"])
+    for position, row in enumerate(rows, 1):
+        row["position"] = position
+    old_board, new_board = Leaderboard(None, old), Leaderboard(None, {**old, "leaderboard": rows})
+    return lambda: new_board.snapshot().diff(old_board.snapshot()).climbers(10)
+
+
+def decode_updates(size: int) -> Callable[[], Any]:
+    body = json.dumps(payloads.updates(size)).encode("utf-8")
+    codec = get_codec()
+    return lambda: codec.loads(body)
+
+
+def decode_leaderboard(size: int) -> Callable[[], Any]:
+    body = json.dumps(payloads.leaderboard(size)).encode("utf-8")
+    codec = get_codec()
+    return lambda: codec.loads(body)
+
+
+def stream_users(size: int) -> Callable[[], Any]:
+    body = json.dumps(payloads.users(size)).encode("utf-8")
+    codec = get_codec()
+    chunks = [body[i : i + 64 * 1024] for i in range(0, len(body), 64 * 1024)]
+
+    def stream() -> int:
+        decoder = IncrementalArrayDecoder(codec.loads)
+        count = sum(len(decoder.feed(chunk)) for chunk in chunks)
+        decoder.close()
+        return count
+
+    return stream
+
+
+BENCHMARKS: Dict[str, Setup] = {
+    "update.construct": update_construct,
+    "update.construct.legacy": update_construct_legacy,
+    "update.access": update_access,
+    "update.access.legacy": update_access_legacy,
+    "timestamp.parse": timestamp_parse,
+    "timestamp.parse.dateutil": timestamp_parse_dateutil,
+    "history.query": history_query,
+    "history.query.scan": history_query_scan,
+    "trainer.construct": trainer_construct,
+    "leaderboard.iterate": leaderboard_iterate,
+    "leaderboard.getitem": leaderboard_getitem,
+    "leaderboard.lookup": leaderboard_lookup,
+    "leaderboard.diff": leaderboard_diff,
+    "http.decode.updates": decode_updates,
+    "http.decode.leaderboard": decode_leaderboard,
+    "http.stream.users": stream_users,
+}
@@ -0,0 +1,116 @@
+"""Timing, allocation tracking and reporting shared by the benchmark suites."""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+Setup = Callable[[int], Callable[[], Any]]
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    size: int
+    repeat: int
+    best: float
+    median: float
+    per_item_ns: float
+    peak_bytes: int
+    result_bytes: int
+
+
+def measure(name: str, size: int, setup: Setup, repeat: int = 5) -> Result:
+    """Times ``setup(size)()`` ``repeat`` times, then runs it once more under tracemalloc.
+
+    Memory is measured separately, as tracing slows everything down considerably. The peak is
+    the most allocated at any point during the run, and the result size is what's still held
+    by the value it returned, e.g. the models it constructed.
+    """
+    func = setup(size)
+    func()  # Warm up caches, lazy imports and the like
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = func()
+        held, peak = tracemalloc.get_traced_memory()
+        del value
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return Result(
+        name=name,
+        size=size,
+        repeat=repeat,
+        best=best,
+        median=statistics.median(timings),
+        per_item_ns=best / max(size, 1) * 1e9,
+        peak_bytes=peak,
+        result_bytes=held,
+    )
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+    }
+
+
+def header() -> None:
+    print(
+        f"{'benchmark':<28} {'size':>8} {'best':>11} {'median':>11} {'per item':>11} "
+        f"{'peak mem':>10} {'result':>10}"
+    )
+
+
+def row(result: Result) -> None:
+    print(
+        f"{result.name:<28} {result.size:>8} {result.best * 1e3:>9.2f}ms "
+        f"{result.median * 1e3:>9.2f}ms {result.per_item_ns / 1e3:>9.2f}us "
+        f"{result.peak_bytes / 1024:>8.0f}KB {result.result_bytes / 1024:>8.0f}KB"
+    )
+
+
+def dump(results: Iterable[Result], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {"environment": environment(), "results": [asdict(result) for result in results]},
+            f,
+            indent=2,
+        )
+
+
+def compare(results: Iterable[Result], baseline_path: str, threshold: float) -> List[str]:
+    """Returns a line for every benchmark that is more than ``threshold`` slower than before."""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous: Optional[Dict[str, Any]] = baseline.get((result.name, result.size))
+        if previous is None or not previous["best"]:
+            continue
+        ratio = result.best / previous["best"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result.name}[{result.size}]: {previous['best'] * 1e3:.2f}ms -> "
+                f"{result.best * 1e3:.2f}ms ({ratio:.2f}x)"
+            )
+    return regressions
@@ -0,0 +1,42 @@
+"""Deterministic synthetic payloads at arbitrary sizes, for the benchmarks."""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from trainerdex.api.testing.dataset import leaderboard_entry, trainer, update, user
+
+
+def users(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [user(rng, i) for i in range(1, n + 1)]
+
+
+def trainers(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [trainer(rng, i) for i in range(1, n + 1)]
+
+
+def updates(n: int, trainer_id: int = 1, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [update(rng, trainer_id) for _ in range(n)]
+
+
+def leaderboard(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    entries = [leaderboard_entry(rng, i) for i in range(1, n + 1)]
+    values = [entry["value"] for entry in entries]
+    return {
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "stat": "total_xp",
+        "title": "Global Leaderboard",
+        "aggregations": {
+            "avg": sum(values) / n if n else 0,
+            "count": n,
+            "min": min(values, default=0),
+            "max": max(values, default=0),
+            "sum": sum(values),
+        },
+        "leaderboard": entries,
+    }
@@ -0,0 +1,42 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from trainerdex.api.client.client_credentials import ClientCredentialsClient
+from trainerdex.api.testing import Dataset, FakeTrainerDexServer
+
+
+class ShortLivedTokenTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = FakeTrainerDexServer(
+            Dataset.generate(trainers=3), require_auth=True, token_lifetime=2
+        )
+        await self.server.start()
+        self.addAsyncCleanup(self.server.close)
+
+    async def test_refreshed_halfway_through_its_lifetime(self) -> None:
+        # The default refresh_margin of 300 seconds is longer than the token's lifetime
+        async with self.server.client(ClientCredentialsClient) as client:
+            await client.authenticate(client_id="id", client_secret="secret")
+            await asyncio.sleep(0.5)
+            self.assertEqual(self.server.tokens_issued, 1)
+            await asyncio.sleep(1.0)
+            self.assertEqual(self.server.tokens_issued, 2)
+
+    async def test_failed_background_refresh_is_logged_and_retried_on_demand(self) -> None:
+        async with self.server.client(ClientCredentialsClient) as client:
+            await client.authenticate(client_id="id", client_secret="secret")
+            mint = client._mint_token
+            with mock.patch.object(client, "_mint_token", side_effect=ConnectionError):
+                with self.assertLogs("trainerdex.api.http.auth.oauth", "WARNING"):
+                    await asyncio.sleep(1.2)
+            self.assertEqual(self.server.tokens_issued, 1)
+
+            with mock.patch.object(client, "_mint_token", side_effect=mint) as retried:
+                await client.get_trainer(1)
+            retried.assert_awaited_once()
+            self.assertEqual(self.server.tokens_issued, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
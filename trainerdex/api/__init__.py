@@ -9,6 +9,17 @@ A basic wrapper for the TrainerDex API.
 
 """
 
-import pkg_resources
 
-__version__ = pkg_resources.get_distribution("trainerdex").version
+def __getattr__(name: str) -> str:
+    # Reading package metadata is slow, so it's put off until the version is first asked for
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib.metadata import PackageNotFoundError, version
+
+    global __version__
+    try:
+        __version__ = version("trainerdex")
+    except PackageNotFoundError:
+        __version__ = "0+unknown"
+    return __version__
@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 
 class UUIDMixin:
+    __slots__ = ()
+
     uuid: UUID
 
     def __eq__(self, other) -> bool:
@@ -22,6 +24,8 @@ class UUIDMixin:
 
 
 class BaseClass:
+    __slots__ = ()
+
     def __init__(self, client: BaseClient, data: Any) -> None:
         self.client = client
         self._update(data)
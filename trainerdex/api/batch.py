@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+)
+
+from typing_extensions import Self
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class BatchResult(Generic[T]):
+    """The outcome of one item in a :class:`Batch`.
+
+    ``index`` is the order the item was submitted in, and ``key`` is whatever it was submitted
+    with, such as the ID being fetched. Exactly one of ``value`` and ``error`` is meaningful.
+    """
+
+    index: int
+    key: Any
+    value: Optional[T] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> T:
+        """Returns the value, or raises the error."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Batch(Generic[T]):
+    """Runs many calls with a bound on how many are in flight at once.
+
+    A failing item doesn't cancel the others, its exception is collected in its
+    :class:`BatchResult` instead. Leaving the ``async with`` block waits for outstanding items,
+    unless it's left by an exception, in which case they're cancelled.
+
+    Examples
+    --------
+    >>> async with client.batch(concurrency=10) as batch:
+    ...     batch.map(client.get_trainer, trainer_ids)
+    ...     async for result in batch.as_completed():
+    ...         if result.ok:
+    ...             print(result.value.username)
+    """
+
+    def __init__(self, concurrency: int = 10) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task[BatchResult[T]]] = []
+
+    def submit(self, func: Callable[..., Awaitable[T]], *args, key: Any = None, **kwargs) -> int:
+        """Schedules ``func(*args, **kwargs)`` and returns its index.
+
+        ``func`` is only called once a slot is free, so no request is started early.
+        """
+        index = len(self._tasks)
+        self._tasks.append(asyncio.ensure_future(self._run(index, key, func, args, kwargs)))
+        return index
+
+    def map(self, func: Callable[[Any], Awaitable[T]], items: Iterable[Any]) -> None:
+        """Submits ``func(item)`` for each item, keyed by the item."""
+        for item in items:
+            self.submit(func, item, key=item)
+
+    async def _run(
+        self, index: int, key: Any, func: Callable[..., Awaitable[T]], args: tuple, kwargs: dict
+    ) -> BatchResult[T]:
+        async with self._semaphore:
+            try:
+                value = await func(*args, **kwargs)
+            except Exception as e:
+                return BatchResult(index, key, error=e)
+            return BatchResult(index, key, value=value)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def as_completed(self) -> AsyncIterator[BatchResult[T]]:
+        """Yields results as soon as each finishes."""
+        for future in asyncio.as_completed(self._tasks):
+            yield await future
+
+    async def in_order(self) -> AsyncIterator[BatchResult[T]]:
+        """Yields results in the order they were submitted, each as soon as it's next in line."""
+        for task in self._tasks:
+            yield await task
+
+    async def results(self) -> List[BatchResult[T]]:
+        """Waits for everything and returns the results in submission order."""
+        return list(await asyncio.gather(*self._tasks))
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is not None:
+            self.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
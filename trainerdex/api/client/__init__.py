@@ -1,2 +1,9 @@
-from .base import BaseClient
-from .token import TokenClient
+from typing import TYPE_CHECKING
+
+from trainerdex.api.utils import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import BaseClient
+    from .token import TokenClient
+
+__getattr__, __dir__ = lazy_exports(__name__, {"BaseClient": ".base", "TokenClient": ".token"})
@@ -1,32 +1,142 @@
 from __future__ import annotations
 
 import datetime
-from typing import Iterable, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+from uuid import UUID
 
+from trainerdex.api.batch import Batch, BatchResult
 from trainerdex.api.exceptions import NotFound
 from trainerdex.api.faction import Faction
 from trainerdex.api.http import APIV1Mixin
+from trainerdex.api.identity import IdentityMap
 from trainerdex.api.leaderboard import (
+    BaseLeaderboard,
     CommunityLeaderboard,
     CountryLeaderboard,
     GuildLeaderboard,
     Leaderboard,
+    LeaderboardCache,
+    LeaderboardQuery,
 )
 from trainerdex.api.socialconnection import SocialConnection
 from trainerdex.api.trainer import Trainer
 from trainerdex.api.types.v1.trainer import CreateTrainer
 from trainerdex.api.types.v1.user import CreateUser
+from trainerdex.api.update import Update
 from trainerdex.api.user import User
 from trainerdex.api.utils import HasID
 
+if TYPE_CHECKING:
+    from trainerdex.api.types.v1.trainer import ReadTrainer
+
+ModelT = TypeVar("ModelT")
+UpdateLoading = Literal["eager", "lazy", "latest"]
+
 
 class BaseClient(APIV1Mixin):
-    async def get_trainer(self, trainer_id: int) -> Trainer:
-        data = await self._v1_get_trainer(trainer_id)
-        trainer = Trainer(client=self, data=data)
-        await trainer.fetch_updates()
+    """The TrainerDex API client.
+
+    Trainers, users and updates are kept in an :class:`~trainerdex.api.identity.IdentityMap`,
+    so every lookup of a record returns the same object, refreshed in place when it's fetched
+    again. :meth:`get_trainer` and :meth:`get_user` always fetch unless passed ``cached=True``,
+    when a recently loaded object is returned as it is. Pass ``identity_map`` to size it or
+    share it, and read ``identity_map.stats()`` for its hit rate.
+
+    ``update_loading`` sets how much of a trainer's update history :meth:`get_trainer` loads:
+
+    - ``"eager"`` fetches the whole history with the trainer, in a second request.
+    - ``"lazy"`` fetches nothing until :meth:`Trainer.get_updates`, :meth:`Trainer.get_level` or
+      :meth:`Trainer.get_latest_update` is awaited.
+    - ``"latest"`` uses the summary of the latest update sent with the trainer, which has its
+      total XP and level, and fetches the rest only when :meth:`Trainer.get_updates` is
+      awaited.
+
+    Leaderboards fetched by :meth:`iter_leaderboards` are kept in ``leaderboard_cache``.
+    """
+
+    def __init__(
+        self,
+        *args,
+        identity_map: Optional[IdentityMap] = None,
+        update_loading: UpdateLoading = "eager",
+        leaderboard_cache: Optional[LeaderboardCache] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.identity_map: IdentityMap = identity_map or IdentityMap()
+        self.update_loading: UpdateLoading = update_loading
+        self.leaderboard_cache: LeaderboardCache = (
+            LeaderboardCache() if leaderboard_cache is None else leaderboard_cache
+        )
+
+    def _load(self, cls: Type[ModelT], key: Hashable, data: Any) -> ModelT:
+        return self.identity_map.load(cls, key, data, lambda: cls(client=self, data=data))
+
+    def _load_trainer(self, data: ReadTrainer, updates: Optional[UpdateLoading] = None) -> Trainer:
+        trainer = self._load(Trainer, data["id"], data)
+        if (updates or self.update_loading) == "latest":
+            trainer._use_update_set(data.get("update_set"))
+        return trainer
+
+    async def get_trainer(
+        self, trainer_id: int, *, updates: Optional[UpdateLoading] = None, cached: bool = False
+    ) -> Trainer:
+        """Fetches a trainer, loading their updates as ``updates`` says, or ``update_loading``
+        by default.
+
+        If ``cached``, a trainer loaded within the identity map's ``ttl`` is returned without
+        fetching it again.
+        """
+        updates = updates or self.update_loading
+        trainer = self.identity_map.get(Trainer, trainer_id) if cached else None
+        if trainer is None:
+            data = await self._v1_get_trainer(trainer_id)
+            trainer = self._load_trainer(data, updates)
+            if updates == "eager":
+                await trainer.fetch_updates(incremental=trainer.updates_loaded)
+        elif updates == "eager" and not trainer.updates_loaded:
+            await trainer.fetch_updates()
         return trainer
 
+    def batch(self, concurrency: int = 10) -> Batch:
+        """Returns a :class:`~trainerdex.api.batch.Batch` for running many calls at once."""
+        return Batch(concurrency=concurrency)
+
+    async def get_trainers_by_id(
+        self, trainer_ids: Iterable[int], *, concurrency: int = 10, ordered: bool = True
+    ) -> AsyncIterator[BatchResult[Trainer]]:
+        """Fetches many trainers, at most ``concurrency`` at a time.
+
+        Results are yielded in the order of ``trainer_ids`` if ``ordered``, otherwise as soon as
+        each completes. A trainer that fails to load is yielded with its ``error`` set, rather
+        than stopping the others.
+        """
+        async with self.batch(concurrency) as batch:
+            batch.map(self.get_trainer, trainer_ids)
+            async for result in batch.in_order() if ordered else batch.as_completed():
+                yield result
+
+    async def get_users_by_id(
+        self, user_ids: Iterable[int], *, concurrency: int = 10, ordered: bool = True
+    ) -> AsyncIterator[BatchResult[User]]:
+        """Fetches many users, as :meth:`get_trainers_by_id` does trainers."""
+        async with self.batch(concurrency) as batch:
+            batch.map(self.get_user, user_ids)
+            async for result in batch.in_order() if ordered else batch.as_completed():
+                yield result
+
     async def create_trainer(
         self,
         username: str,
@@ -43,7 +153,7 @@ class BaseClient(APIV1Mixin):
         """
         if user is None:
             user_data = await self._v1_create_user(CreateUser(username=username))
-            user = User(client=self, data=user_data)
+            user = self._load(User, user_data["id"], user_data)
 
         assert isinstance(user, User)
 
@@ -57,31 +167,58 @@ class BaseClient(APIV1Mixin):
         )
 
         data = await self._v1_create_trainer(payload)
-        trainer = Trainer(client=self, data=data)
-        user._trainer, trainer._user = trainer, user
+        trainer = self._load(Trainer, data["id"], data)
+        user.trainer_id = trainer.id
         return trainer
 
-    async def get_trainers(
-        self, *, team: Union[int, Faction] = None, username: str = None
-    ) -> List[Trainer]:
+    @staticmethod
+    def _team_id(team: Union[int, Faction, None]) -> Optional[int]:
         if isinstance(team, Faction):
-            t = team.id
+            return team.id
         elif isinstance(team, int):
             assert team in (0, 1, 2, 3)
-            t = team
+            return team
         else:
-            t = None
+            return None
 
-        query = await self._v1_get_trainers(team=t, username=username)
-        return [Trainer(client=self, data=trainer) for trainer in query]
+    async def get_trainers(
+        self, *, team: Union[int, Faction] = None, username: str = None
+    ) -> List[Trainer]:
+        query = await self._v1_get_trainers(t=self._team_id(team), q=username)
+        return [self._load_trainer(trainer) for trainer in query]
 
-    async def get_user(self, user_id: int) -> User:
-        data = await self._v1_get_user(user_id)
-        return User(client=self, data=data)
+    async def iter_trainers(
+        self, *, team: Union[int, Faction] = None, username: str = None
+    ) -> AsyncIterator[Trainer]:
+        """Like :meth:`get_trainers`, but yields each trainer as soon as it's been received."""
+        async for trainer in self._v1_iter_trainers(t=self._team_id(team), q=username):
+            yield self._load_trainer(trainer)
+
+    async def iter_updates(self, trainer_id: int) -> AsyncIterator[Update]:
+        """Yields a trainer's updates as soon as each has been received."""
+        async for update in self._v1_iter_updates_for_trainer(trainer_id):
+            yield self._load(Update, UUID(update["uuid"]), update)
+
+    async def get_user(self, user_id: int, *, cached: bool = False) -> User:
+        """Fetches a user. If ``cached``, one loaded within the identity map's ``ttl`` is
+        returned without fetching it again."""
+        user = self.identity_map.get(User, user_id) if cached else None
+        if user is None:
+            data = await self._v1_get_user(user_id)
+            user = self._load(User, data["id"], data)
+        return user
 
     async def get_users(self) -> Iterable[User]:
         data = await self._v1_get_users()
-        return tuple(User(client=self, data=d) for d in data)
+        return tuple(self._load(User, d["id"], d) for d in data)
+
+    async def iter_users(self) -> AsyncIterator[User]:
+        """Like :meth:`get_users`, but yields each user as soon as they've been received.
+
+        Only one user's data is held in memory at a time, however large the full list is.
+        """
+        async for user in self._v1_iter_users():
+            yield self._load(User, user["id"], user)
 
     async def get_social_connections(
         self, provider: str, uid: Union[str, Iterable[str]]
@@ -96,6 +233,7 @@ class BaseClient(APIV1Mixin):
         community: Optional[str] = None,
         country: Optional[str] = None,
     ) -> Union[Leaderboard, GuildLeaderboard, CommunityLeaderboard, CountryLeaderboard]:
+        guild_id = None
         if guild is not None:
             if isinstance(guild, HasID):
                 guild_id = guild.id
@@ -109,7 +247,6 @@ class BaseClient(APIV1Mixin):
         elif country is not None:
             cls = CountryLeaderboard
         else:
-            guild_id = None
             cls = Leaderboard
 
         data = await self._v1_get_leaderboard(
@@ -120,6 +257,61 @@ class BaseClient(APIV1Mixin):
         )
         return cls(client=self, data=data)
 
+    async def iter_leaderboards(
+        self,
+        stats: Iterable[str] = ("total_xp",),
+        *,
+        guilds: Iterable[Union[int, HasID]] = (),
+        communities: Iterable[str] = (),
+        countries: Iterable[str] = (),
+        include_global: bool = False,
+        concurrency: int = 10,
+    ) -> AsyncIterator[BatchResult[BaseLeaderboard]]:
+        """Fetches every combination of ``stats`` with the given scopes, at most
+        ``concurrency`` at a time, and yields each as soon as it completes.
+
+        Each result is keyed by its :class:`~trainerdex.api.leaderboard.LeaderboardQuery`.
+        Repeated combinations are fetched once, and leaderboards fetched within
+        ``leaderboard_cache.ttl`` seconds, by this or an earlier call, aren't fetched again.
+        A leaderboard that fails to load is yielded with its ``error`` set.
+
+        Examples
+        --------
+        >>> async for result in client.iter_leaderboards(
+        ...     ["total_xp", "badge_travel_km"], guilds=guild_ids, countries=["GB", "US"]
+        ... ):
+        ...     if result.ok:
+        ...         await post(result.key, result.value)
+        """
+        stats = list(stats)
+        scopes = [
+            *({"guild_id": guild.id if isinstance(guild, HasID) else guild} for guild in guilds),
+            *({"community": community} for community in communities),
+            *({"country": country} for country in countries),
+            *([{}] if include_global else []),
+        ]
+        queries = dict.fromkeys(
+            LeaderboardQuery(stat, **scope) for scope in scopes for stat in stats
+        )
+
+        async with self.batch(concurrency) as batch:
+            for query in queries:
+                batch.submit(self._get_cached_leaderboard, query, key=query)
+            async for result in batch.as_completed():
+                yield result
+
+    async def _get_cached_leaderboard(self, query: LeaderboardQuery) -> BaseLeaderboard:
+        endpoint = self._v1_leaderboard_endpoint(
+            query.stat, query.guild_id, query.community, query.country
+        )
+        leaderboard = self.leaderboard_cache.get(endpoint)
+        if leaderboard is None:
+            leaderboard = await self.get_leaderboard(
+                query.stat, query.guild_id, query.community, query.country
+            )
+            self.leaderboard_cache.store(endpoint, leaderboard)
+        return leaderboard
+
     async def search_trainer(self, nickname: str) -> Trainer:
         """Searches for a trainer with a certain nickname
 
@@ -145,6 +337,6 @@ class BaseClient(APIV1Mixin):
         queryset = await self._v1_get_trainers(q=nickname)
 
         if len(queryset) == 1:
-            return Trainer(client=self, data=queryset[0])
+            return self._load_trainer(queryset[0])
         else:
             raise NotFound(f"Could not find trainer with nickname {nickname}")
@@ -30,9 +30,11 @@ class AsyncManagedProperty:
 
 class DiscordConfig(BaseClass):
     def _update(self, data: ReadDiscordConfig) -> None:
-        self._id: int = data.pop("id")  # type: ignore
+        self._id: int = data["id"]
         self.managed_properties = set()
         for key, value in data.items():
+            if key == "id":
+                continue
             setattr(self, f"_{key}", value)
             self.managed_properties.add(key)
 
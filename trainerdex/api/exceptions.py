@@ -12,3 +12,7 @@ class Forbidden(Exception):
 
 class NotFound(Exception):
     pass
+
+
+class CircuitOpen(HTTPException):
+    pass
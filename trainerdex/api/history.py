@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import datetime
+import math
+import weakref
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from trainerdex.api.update import Update
+
+Moment = Union[datetime.datetime, float]
+
+
+@lru_cache(maxsize=None)
+def _numpy() -> Any:
+    """Returns NumPy if it's installed, importing it on first use."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _timestamp(moment: Optional[Moment]) -> float:
+    if moment is None:
+        return -math.inf
+    if isinstance(moment, datetime.datetime):
+        return moment.timestamp()
+    return float(moment)
+
+
+class UpdateHistory(Sequence["Update"]):
+    """A trainer's updates, oldest first, with columnar indexes for querying stats over time.
+
+    Alongside the updates, it keeps their timestamps in a sorted array and, for each stat once
+    it's first queried, an array of its values with ``NaN`` where an update doesn't include it.
+    Lookups are binary searches over these, and queries over many moments are vectorised. NumPy
+    arrays are used when it's installed, and :class:`array.array` otherwise.
+
+    Updates can't be added to or removed from a history, but they're shared, so one may be
+    changed in place by a sync, :meth:`~trainerdex.api.update.Update.edit` or
+    :meth:`~trainerdex.api.update.Update.refresh_from_api`. The history then re-sorts and
+    re-indexes on its next use. Updates without a timestamp sort first.
+    """
+
+    __slots__ = ("_updates", "_timestamps", "_columns", "_by_uuid", "_stale", "__weakref__")
+
+    def __init__(self, updates: Iterable[Update] = ()) -> None:
+        self._index(updates)
+        # Each update tells the histories holding it when it changes
+        ref = weakref.ref(self)
+        for update in self._updates:
+            update._held_by(ref)
+
+    def _index(self, updates: Iterable[Update]) -> None:
+        self._stale = False
+        pairs = sorted(
+            ((_timestamp(update.update_time), update) for update in updates), key=lambda p: p[0]
+        )
+        self._updates: Tuple[Update, ...] = tuple(update for _, update in pairs)
+        # Made an array on first use, so NumPy isn't imported until the history is queried
+        self._timestamps: Any = [timestamp for timestamp, _ in pairs]
+        # stat -> (values, indices of the updates which include it)
+        self._columns: Dict[str, Tuple[Any, Any]] = {}
+        self._by_uuid: Optional[Dict[UUID, Update]] = None
+
+    def _invalidate(self) -> None:
+        """Called by an update in the history when it's changed in place."""
+        self._stale = True
+
+    def _current(self) -> Tuple[Update, ...]:
+        """The updates, re-indexed first if one has changed since they were indexed."""
+        if self._stale:
+            self._index(self._updates)
+        return self._updates
+
+    @property
+    def backend(self) -> str:
+        return "numpy" if _numpy() is not None else "array"
+
+    @staticmethod
+    def _array(values: List[float]) -> Any:
+        np = _numpy()
+        if np is not None:
+            return np.array(values, dtype=np.float64)
+        return array("d", values)
+
+    @overload
+    def __getitem__(self, index: int) -> Update:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[Update, ...]:
+        ...
+
+    def __getitem__(self, index):
+        return self._current()[index]
+
+    def __len__(self) -> int:
+        return len(self._updates)
+
+    def __iter__(self) -> Iterator[Update]:
+        return iter(self._current())
+
+    def __repr__(self) -> str:
+        return f"<UpdateHistory updates={len(self)} backend={self.backend}>"
+
+    @property
+    def timestamps(self) -> Any:
+        """The POSIX timestamp of each update, in ascending order."""
+        self._current()
+        timestamps = self._timestamps
+        if isinstance(timestamps, list):
+            timestamps = self._timestamps = self._array(timestamps)
+        return timestamps
+
+    @property
+    def latest(self) -> Optional[Update]:
+        updates = self._current()
+        return updates[-1] if updates else None
+
+    def get(self, uuid: UUID) -> Optional[Update]:
+        """The update with ``uuid``, if it's in the history."""
+        updates = self._current()
+        if self._by_uuid is None:
+            self._by_uuid = {update.uuid: update for update in updates}
+        return self._by_uuid.get(uuid)
+
+    def merged(
+        self, added: Iterable[Update] = (), removed: Collection[Update] = ()
+    ) -> UpdateHistory:
+        """A new history with ``added`` and without ``removed``, keeping the other updates."""
+        removed = {id(update) for update in removed}
+        kept = (update for update in self._updates if id(update) not in removed)
+        # Timsort makes this linear when the added updates are all newer than the rest
+        return UpdateHistory((*kept, *added))
+
+    def column(self, stat: str) -> Any:
+        """The value of ``stat`` in each update, as floats, with ``NaN`` where it's absent."""
+        return self._column(stat)[0]
+
+    def _column(self, stat: str) -> Tuple[Any, Any]:
+        updates = self._current()
+        column = self._columns.get(stat)
+        if column is None:
+            values = [getattr(update, stat) for update in updates]
+            floats = [math.nan if value is None else float(value) for value in values]
+            present = [i for i, value in enumerate(values) if value is not None]
+            np = _numpy()
+            if np is not None:
+                column = (np.array(floats, dtype=np.float64), np.array(present, dtype=np.intp))
+            else:
+                column = (array("d", floats), array("q", present))
+            self._columns[stat] = column
+        return column
+
+    def latest_value(self, stat: str) -> Any:
+        """The most recent value of ``stat``, skipping updates which don't include it."""
+        present = self._column(stat)[1]
+        if not len(present):
+            return None
+        return getattr(self._updates[present[-1]], stat)
+
+    def value_at(self, stat: str, moment: Moment) -> Any:
+        """The value of ``stat`` as of ``moment``, from the latest update at or before it which
+        includes it."""
+        index = self._index_at(stat, _timestamp(moment))
+        return None if index < 0 else getattr(self._updates[index], stat)
+
+    def update_at(self, moment: Moment) -> Optional[Update]:
+        """The latest update at or before ``moment``."""
+        position = bisect_right(self.timestamps, _timestamp(moment)) - 1
+        return self._updates[position] if position >= 0 else None
+
+    def _index_at(self, stat: str, timestamp: float) -> int:
+        present = self._column(stat)[1]
+        position = bisect_right(self.timestamps, timestamp) - 1
+        if position < 0:
+            return -1
+        k = bisect_right(present, position) - 1
+        return present[k] if k >= 0 else -1
+
+    def values_at(self, stat: str, moments: Sequence[Moment]) -> List[Optional[float]]:
+        """The value of ``stat`` as of each of ``moments``, as floats. ``None`` where there's
+        no value yet."""
+        values, present = self._column(stat)
+        timestamps = [_timestamp(moment) for moment in moments]
+        np = _numpy()
+        if np is None:
+            indices = [self._index_at(stat, timestamp) for timestamp in timestamps]
+            return [values[i] if i >= 0 else None for i in indices]
+
+        positions = np.searchsorted(self.timestamps, timestamps, side="right") - 1
+        k = np.searchsorted(present, positions, side="right") - 1
+        found = (positions >= 0) & (k >= 0)
+        result = np.full(len(timestamps), np.nan)
+        result[found] = values[present[k[found]]]
+        return [None if math.isnan(value) else value for value in result.tolist()]
+
+    def deltas(self, stat: str, boundaries: Sequence[Moment]) -> List[Optional[float]]:
+        """How much ``stat`` changed between each pair of consecutive ``boundaries``.
+
+        For weekly gains, pass the start of each week and the end of the last. An interval is
+        ``None`` if there's no value at either end of it.
+        """
+        values = self.values_at(stat, boundaries)
+        return [
+            None if start is None or end is None else end - start
+            for start, end in zip(values, values[1:])
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class SyncResult:
+    """What changed in a trainer's :class:`UpdateHistory` when it was synced with the API.
+
+    Attributes
+    ----------
+    added: Tuple[:class:`~trainerdex.api.update.Update`, ...]
+        Updates which weren't known before.
+    changed: Tuple[:class:`~trainerdex.api.update.Update`, ...]
+        Known updates which were edited since. They're the same objects, updated in place.
+    removed: Tuple[:class:`~trainerdex.api.update.Update`, ...]
+        Known updates which the API no longer lists. Always empty for an incremental sync.
+    incremental: :class:`bool`
+        Whether only updates newer than the latest known one were fetched.
+    """
+
+    added: Tuple[Update, ...] = ()
+    changed: Tuple[Update, ...] = ()
+    removed: Tuple[Update, ...] = ()
+    incremental: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
@@ -1,2 +1,40 @@
-from .base import BaseHTTPClient
-from .v1_calls import APIV1Mixin
+from typing import TYPE_CHECKING
+
+from trainerdex.api.utils import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import BaseHTTPClient
+    from .cache import CacheStats, HTTPCache
+    from .codec import JSONCodec, get_codec
+    from .metrics import ClientMetrics, HistogramSnapshot, RouteSnapshot
+    from .persistent_cache import PersistentCacheStats, SQLiteCache
+    from .pool import ConnectionPool, PoolStats
+    from .ratelimit import RateLimiter, TokenBucket
+    from .retry import CircuitBreaker, RetryPolicy
+    from .singleflight import SingleFlight, SingleFlightStats
+    from .v1_calls import APIV1Mixin
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "BaseHTTPClient": ".base",
+        "CacheStats": ".cache",
+        "HTTPCache": ".cache",
+        "JSONCodec": ".codec",
+        "get_codec": ".codec",
+        "ClientMetrics": ".metrics",
+        "HistogramSnapshot": ".metrics",
+        "RouteSnapshot": ".metrics",
+        "PersistentCacheStats": ".persistent_cache",
+        "SQLiteCache": ".persistent_cache",
+        "ConnectionPool": ".pool",
+        "PoolStats": ".pool",
+        "RateLimiter": ".ratelimit",
+        "TokenBucket": ".ratelimit",
+        "CircuitBreaker": ".retry",
+        "RetryPolicy": ".retry",
+        "SingleFlight": ".singleflight",
+        "SingleFlightStats": ".singleflight",
+        "APIV1Mixin": ".v1_calls",
+    },
+)
@@ -1,12 +1,26 @@
+from __future__ import annotations
+
+import asyncio
 import base64
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
-from typing import ClassVar, Optional
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, ClassVar, Optional, Tuple, Type
 from zoneinfo import ZoneInfo
 
 from typing_extensions import Self
 
+from trainerdex.api.exceptions import Forbidden
 from trainerdex.api.http.base import BaseHTTPClient
+from trainerdex.api.http.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from aiohttp.typedefs import StrOrURL
+
+    from trainerdex.api.http.auth.oauth.store import SQLiteTokenStore
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True, slots=True)
@@ -18,14 +32,77 @@ class ClientCredentialsToken:
     scope: str
 
     def __repr__(self) -> str:
-        return super().__str__().replace(self.access_token, "*" * len(self.access_token))
+        values = {field.name: getattr(self, field.name) for field in fields(self)}
+        values["access_token"] = "*" * len(self.access_token)
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in values.items())})"
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at - datetime.now(tz=ZoneInfo("UTC")) <= timedelta(seconds=seconds)
 
 
 class ClientCredentialsOAuth(BaseHTTPClient):
+    """Authenticates with the OAuth 2 client credentials grant.
+
+    The token is refreshed in the background ``refresh_margin`` seconds before it expires, or
+    halfway through its lifetime if that's shorter. If that fails, it's logged and the token is
+    refreshed by the next request instead. A request rejected with ``401 Unauthorized`` is
+    retried once with a new token. Concurrent refreshes share a single token request.
+
+    Pass a :class:`~trainerdex.api.http.auth.oauth.store.SQLiteTokenStore` as ``token_store``
+    to share tokens between processes, so a fleet of workers reuses one rather than each
+    minting its own.
+    """
+
     TOKEN_AUTH_URL: ClassVar[str] = "/api/oauth/token/"
-    _token: Optional[ClientCredentialsToken]
+    TOKEN_TEST_URL: ClassVar[str] = "/api/oauth/test/"
+    # The shortest wait between background refreshes, however short the token's lifetime
+    MIN_REFRESH_DELAY: ClassVar[float] = 1.0
+    _token: Optional[ClientCredentialsToken] = None
+
+    def __init__(
+        self,
+        *args,
+        token_store: Optional[SQLiteTokenStore] = None,
+        refresh_margin: float = 300.0,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.token_store: Optional[SQLiteTokenStore] = token_store
+        self.refresh_margin: float = refresh_margin
+        self._credentials: Optional[Tuple[str, str]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Kept apart from the GET coalescing, so its stats only count requests
+        self._token_flight: SingleFlight = SingleFlight()
+
+    @property
+    def token(self) -> Optional[ClientCredentialsToken]:
+        return self._token
+
+    async def authenticate(
+        self, *, client_id: str, client_secret: str, test: bool = False
+    ) -> Self:
+        """Obtains a token, reusing one from ``token_store`` if it's still fresh.
+
+        With ``test``, the token is checked against the API before the client counts as
+        authenticated, at the cost of another round trip.
+        """
+        self._credentials = (client_id, client_secret)
+        await self._refresh_token()
+        if test:
+            self._authenticated = await self._test_authentication()
+        else:
+            self._authenticated = True
+        return self
+
+    def _encode_credentials(self, *, client_id: str, client_secret: str) -> str:
+        return base64.b64encode(f"{client_id}:{client_secret}".encode("utf-8")).decode("utf-8")
+
+    @property
+    def _token_key(self) -> str:
+        return f"{self.HOST}|{self._credentials[0]}"
 
-    async def authenticate(self, *, client_id: str, client_secret: str) -> Self:
+    async def _mint_token(self) -> ClientCredentialsToken:
+        client_id, client_secret = self._credentials
         credentials = self._encode_credentials(client_id=client_id, client_secret=client_secret)
 
         headers = {
@@ -38,24 +115,120 @@ class ClientCredentialsOAuth(BaseHTTPClient):
         }
 
         async with self.session.post(self.TOKEN_AUTH_URL, headers=headers, data=data) as resp:
-            response_datetime = datetime.utcnow().astimezone(tz=ZoneInfo("UTC"))
+            response_datetime = datetime.now(tz=ZoneInfo("UTC"))
             resp.raise_for_status()
             response = await resp.json()
-            self._token = ClientCredentialsToken(
+            return ClientCredentialsToken(
                 expires_at=response_datetime + timedelta(seconds=response["expires_in"]),
                 **response,
             )
 
-            self.session.headers["Authorization"] = f"Bearer {self._token.access_token}"
-            if await self._test_authentication():
-                self._authenticated = True
+    async def _refresh_token(
+        self, rejected: Optional[ClientCredentialsToken] = None
+    ) -> ClientCredentialsToken:
+        """Replaces the current token if it's missing, about to expire or ``rejected``.
 
-        return self
+        Callers racing to refresh share one token request, and a token already replaced since it
+        was rejected isn't replaced again.
+        """
+        return await self._token_flight.do(
+            ("POST", self.TOKEN_AUTH_URL, self._token_key), lambda: self._do_refresh(rejected)
+        )
 
-    def _encode_credentials(self, *, client_id: str, client_secret: str) -> str:
-        return base64.b64encode(f"{client_id}:{client_secret}".encode("utf-8")).decode("utf-8")
+    def _should_refresh(
+        self,
+        token: Optional[ClientCredentialsToken],
+        rejected: Optional[ClientCredentialsToken],
+    ) -> bool:
+        if token is None or token.expires_within(self._refresh_margin(token)):
+            return True
+        return rejected is not None and token.access_token == rejected.access_token
+
+    def _refresh_margin(self, token: ClientCredentialsToken) -> float:
+        """``refresh_margin``, capped at half the token's lifetime so a short-lived token isn't
+        due for a refresh as soon as it's minted."""
+        return min(self.refresh_margin, token.expires_in / 2)
+
+    async def _do_refresh(
+        self, rejected: Optional[ClientCredentialsToken]
+    ) -> ClientCredentialsToken:
+        if self.token_store is not None:
+            token = await self.token_store.refresh(
+                self._token_key,
+                self._mint_token,
+                lambda token: self._should_refresh(token, rejected),
+            )
+        elif self._should_refresh(self._token, rejected):
+            token = await self._mint_token()
+        else:
+            token = self._token
+        self._use_token(token)
+        return token
+
+    def _use_token(self, token: ClientCredentialsToken) -> None:
+        if token is self._token:
+            return
+        self._token = token
+        self._headers["Authorization"] = f"Bearer {token.access_token}"
+        self.session.headers["Authorization"] = f"Bearer {token.access_token}"
+
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        self._refresh_task = asyncio.create_task(self._refresh_in_background(token))
+
+    async def _refresh_in_background(self, token: ClientCredentialsToken) -> None:
+        remaining = (token.expires_at - datetime.now(tz=ZoneInfo("UTC"))).total_seconds()
+        delay = remaining - self._refresh_margin(token)
+        await asyncio.sleep(max(delay, self.MIN_REFRESH_DELAY))
+        refresh = asyncio.ensure_future(self._refresh_token())
+        refresh.add_done_callback(_log_refresh_failure)
+        try:
+            # The task is replaced as soon as a new token is in use, which cancels this one
+            await asyncio.shield(refresh)
+        except Exception:
+            # Already logged, and the next request refreshes the token instead
+            pass
+
+    async def request(
+        self, method: str, path: StrOrURL, *, retry: Optional[bool] = None, **kwargs
+    ) -> Any:
+        token = self._token
+        if (
+            token is not None
+            and self._credentials is not None
+            and self._should_refresh(token, None)
+        ):
+            token = await self._refresh_token()
+        try:
+            return await super().request(method, path, retry=retry, **kwargs)
+        except Forbidden as e:
+            response = e.args[0] if e.args else None
+            if self._credentials is None or getattr(response, "status", None) != 401:
+                raise
+        await self._refresh_token(rejected=token)
+        return await super().request(method, path, retry=retry, **kwargs)
 
     async def _test_authentication(self) -> bool:
-        path = "/api/oauth/test/"
-        async with self.session.get(path) as resp:
+        async with self.session.get(self.TOKEN_TEST_URL) as resp:
             return resp.ok
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        await super().__aexit__(exc_type, exc_val, exc_tb)
+
+
+def _log_refresh_failure(refresh: asyncio.Future) -> None:
+    if not refresh.cancelled() and refresh.exception() is not None:
+        logger.warning(
+            "Refreshing the OAuth token in the background failed, it will be refreshed on the "
+            "next request",
+            exc_info=refresh.exception(),
+        )
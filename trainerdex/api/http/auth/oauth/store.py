@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from trainerdex.api.http.auth.oauth.client_credentials import ClientCredentialsToken
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    key TEXT PRIMARY KEY,
+    access_token TEXT NOT NULL,
+    expires_in INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    token_type TEXT NOT NULL,
+    scope TEXT NOT NULL
+);
+"""
+
+T = TypeVar("T")
+
+
+class SQLiteTokenStore:
+    """Keeps OAuth tokens in a SQLite database, so processes on one host can share them.
+
+    A worker only mints a token when the stored one won't do. The database's write lock isn't
+    held while it does, so workers refreshing at the same moment may each mint one, but the
+    first to be stored is kept and the rest of them switch to it.
+
+    The file holds bearer tokens in plain text. It's created readable by its owner only, and
+    should be kept somewhere other users can't reach.
+
+    Parameters
+    ----------
+    path: Union[:class:`str`, :class:`os.PathLike`]
+        The database file. It's created if it doesn't exist.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = os.fspath(path)
+        # Guards the connection, which is shared by the threads the queries run in
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if not os.path.exists(self.path):
+                os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+            connection = sqlite3.connect(
+                self.path, timeout=60.0, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def get(self, key: str) -> Optional[ClientCredentialsToken]:
+        return await asyncio.to_thread(self._locked, self._get, key)
+
+    async def refresh(
+        self,
+        key: str,
+        mint: Callable[[], Awaitable[ClientCredentialsToken]],
+        should_refresh: Callable[[Optional[ClientCredentialsToken]], bool],
+    ) -> ClientCredentialsToken:
+        """Returns the stored token, unless ``should_refresh`` rejects it, in which case ``mint``
+        is awaited for a new one which replaces it.
+
+        If another process stored a token ``should_refresh`` accepts while this one was minting,
+        that token is kept and returned instead.
+        """
+        token = await asyncio.to_thread(self._transaction, self._get, key)
+        if not should_refresh(token):
+            return token
+        token = await mint()
+        return await asyncio.to_thread(
+            self._transaction, self._replace, key, token, should_refresh
+        )
+
+    async def discard(self, key: str) -> None:
+        await asyncio.to_thread(
+            self._locked, self._execute, "DELETE FROM tokens WHERE key = ?", key
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _locked(self, work: Callable[..., T], *args) -> T:
+        with self._lock:
+            return work(*args)
+
+    def _transaction(self, work: Callable[..., T], *args) -> T:
+        """Runs ``work`` in a transaction holding the database's write lock.
+
+        It's run to completion in one thread, so cancelling the caller can't leave the
+        transaction open.
+        """
+        with self._lock:
+            connection = self.connection
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                result = work(*args)
+                connection.execute("COMMIT")
+                return result
+            finally:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+
+    def _replace(
+        self,
+        key: str,
+        token: ClientCredentialsToken,
+        should_refresh: Callable[[Optional[ClientCredentialsToken]], bool],
+    ) -> ClientCredentialsToken:
+        stored = self._get(key)
+        if not should_refresh(stored):
+            return stored
+        self._put(key, token)
+        return token
+
+    def _execute(self, sql: str, *parameters) -> None:
+        self.connection.execute(sql, parameters)
+
+    def _get(self, key: str) -> Optional[ClientCredentialsToken]:
+        row = self.connection.execute(
+            "SELECT access_token, expires_in, expires_at, token_type, scope "
+            "FROM tokens WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        access_token, expires_in, expires_at, token_type, scope = row
+        return ClientCredentialsToken(
+            access_token=access_token,
+            expires_in=expires_in,
+            expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            token_type=token_type,
+            scope=scope,
+        )
+
+    def _put(self, key: str, token: ClientCredentialsToken) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO tokens "
+            "(key, access_token, expires_in, expires_at, token_type, scope) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                token.access_token,
+                token.expires_in,
+                token.expires_at.timestamp(),
+                token.token_type,
+                token.scope,
+            ),
+        )
@@ -3,46 +3,86 @@ from __future__ import annotations
 import asyncio
 import os
 import sys
+import time
 from abc import abstractclassmethod
 from types import MappingProxyType, TracebackType
 from typing import (
     TYPE_CHECKING,
     Any,
+    AsyncIterator,
     ClassVar,
     Coroutine,
     Dict,
     NoReturn,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
 )
 
-from aiohttp import ContentTypeError
-from aiohttp import __version__ as aiohttp_version
-from aiohttp.client import ClientSession
-from aiohttp.typedefs import StrOrURL
 from typing_extensions import Self
 
-from trainerdex.api import __version__
 from trainerdex.api.exceptions import Forbidden, HTTPException, NotFound
+from trainerdex.api.http.cache import HTTPCache
+from trainerdex.api.http.codec import JSONCodec, get_codec
+from trainerdex.api.http.metrics import ClientMetrics
+from trainerdex.api.http.pool import ConnectionPool
+from trainerdex.api.http.ratelimit import RateLimiter
+from trainerdex.api.http.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from trainerdex.api.http.routes import route_template
+from trainerdex.api.http.singleflight import SingleFlight, request_key
+from trainerdex.api.http.streaming import IncrementalArrayDecoder
 
 if TYPE_CHECKING:
+    from aiohttp import ClientResponse
+    from aiohttp.client import ClientSession
+    from aiohttp.typedefs import StrOrURL
+
+    from trainerdex.api.http.persistent_cache import SQLiteCache
+
     T = TypeVar("T")
     Response = Coroutine[Any, Any, T]
+    Stream = AsyncIterator[T]
 
 
 class BaseHTTPClient:
     """Represents an HTTP client sending HTTP requests to the TrainerDex API."""
 
     HOST: ClassVar[str] = os.environ.get("TRAINERDEX_HOST", "https://trainerdex.app/")
+    STREAM_CHUNK_SIZE: ClassVar[int] = 64 * 1024
 
-    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    def __init__(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        *,
+        pool: Optional[ConnectionPool] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        coalesce_requests: bool = True,
+        cache: Optional[HTTPCache] = None,
+        json_codec: Optional[JSONCodec] = None,
+        metrics: Optional[ClientMetrics] = None,
+        persistent_cache: Optional[SQLiteCache] = None,
+    ) -> None:
         self.loop: asyncio.AbstractEventLoop = loop or asyncio.get_event_loop()
         self._headers: Dict[str, str] = {
             "User-Agent": self.user_agent,
         }
         self._authenticated: bool = False
+        # A pool passed in is shared and left open on exit, otherwise the client owns its own.
+        self._owns_pool: bool = pool is None
+        self.pool: ConnectionPool = pool or ConnectionPool()
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+        self.coalesce_requests: bool = coalesce_requests
+        self.single_flight: SingleFlight = SingleFlight()
+        self.cache: Optional[HTTPCache] = cache
+        self.json_codec: JSONCodec = json_codec or get_codec()
+        self.metrics: ClientMetrics = metrics or ClientMetrics()
+        self.persistent_cache: Optional[SQLiteCache] = persistent_cache
+        self._revalidations: Dict[Tuple, asyncio.Task] = {}
 
     @property
     def user_agent(self) -> str:
@@ -51,6 +91,10 @@ class BaseHTTPClient:
             "Python/{1} "
             "aiohttp/{2}"
         )
+        from aiohttp import __version__ as aiohttp_version
+
+        from trainerdex.api import __version__
+
         return user_agent.format(__version__, sys.version, aiohttp_version)
 
     @property
@@ -62,37 +106,250 @@ class BaseHTTPClient:
         return MappingProxyType(self._headers)
 
     def _create_session(self) -> ClientSession:
+        from aiohttp.client import ClientSession
+
         return ClientSession(
             base_url=self.HOST,
             headers=self.headers,
             loop=self.loop,
+            connector=self.pool.connector,
+            connector_owner=False,
+            trace_configs=[self.pool.trace_config, self.metrics.trace_config],
         )
 
     @property
     def session(self) -> ClientSession:
         maybe_session: Union[ClientSession, None] = getattr(self, "_session", None)
-        if isinstance(maybe_session, ClientSession) and not maybe_session.closed:
+        if maybe_session is not None and not maybe_session.closed:
             return maybe_session
         else:
             raise RuntimeError("Session is not open. Please use an async context manager.")
 
-    async def request(self, method: str, path: StrOrURL, **kwargs) -> Any:
+    def circuit_breaker(self, path: StrOrURL) -> CircuitBreaker:
+        """Returns the circuit breaker guarding the endpoint ``path`` belongs to."""
+        endpoint = route_template(path)
+        breaker = self._circuit_breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._circuit_breakers[endpoint] = CircuitBreaker(
+                endpoint,
+                threshold=self.retry_policy.circuit_breaker_threshold,
+                timeout=self.retry_policy.circuit_breaker_timeout,
+            )
+        return breaker
+
+    async def request(
+        self, method: str, path: StrOrURL, *, retry: Optional[bool] = None, **kwargs
+    ) -> Any:
+        """Sends a request, retrying it according to :attr:`retry_policy`.
+
+        ``retry`` overrides whether the policy considers ``method`` safe to retry.
+
+        Identical GET requests made while one is already in flight share its response, unless
+        ``coalesce_requests`` was disabled. Callers must treat the returned data as read-only.
+        """
+        if self.coalesce_requests and method.upper() == "GET" and kwargs.keys() <= {"params"}:
+            key = request_key(method, path, kwargs.get("params"))
+            return await self.single_flight.do(
+                key, lambda: self._request(method, path, retry=retry, **kwargs)
+            )
+        return await self._request(method, path, retry=retry, **kwargs)
+
+    async def _request(
+        self,
+        method: str,
+        path: StrOrURL,
+        *,
+        retry: Optional[bool] = None,
+        revalidate: bool = False,
+        **kwargs,
+    ) -> Any:
+        route = route_template(path)
+        is_get = method.upper() == "GET"
+        if not is_get:
+            if self.cache is not None:
+                self.cache.invalidate(path)
+            if self.persistent_cache is not None:
+                await self.persistent_cache.invalidate(str(path))
+
+        if not (is_get and kwargs.keys() <= {"params"}) or (
+            self.cache is None and self.persistent_cache is None
+        ):
+            response, data, _ = await self._send_with_retries(method, path, route, retry, **kwargs)
+            return self._handle_response(response, data)
+
+        key = request_key(method, path, kwargs.get("params"))
+        entry = stored = None
+        if self.cache is not None and (entry := self.cache.get(key)) is not None:
+            if entry.fresh and not revalidate:
+                return entry.data
+            kwargs["headers"] = entry.conditional_headers()
+        elif self.persistent_cache is not None:
+            if (stored := await self.persistent_cache.get(key)) is not None:
+                if not revalidate:
+                    if stored.fresh:
+                        return self.json_codec.loads(stored.body)
+                    if self.persistent_cache.servable_stale(stored):
+                        self._revalidate_in_background(key, method, path, retry, kwargs)
+                        return self.json_codec.loads(stored.body)
+                kwargs["headers"] = stored.conditional_headers()
+
+        response, data, body = await self._send_with_retries(method, path, route, retry, **kwargs)
+        if response.status == 304 and (entry is not None or stored is not None):
+            if self.persistent_cache is not None:
+                await self.persistent_cache.revalidated(key, route, response.headers)
+            if entry is not None:
+                return self.cache.revalidated(key, entry, route, response.headers)
+            return self.json_codec.loads(stored.body)
+
+        if response.ok:
+            if self.cache is not None:
+                self.cache.store(key, route, response.headers, data, len(body))
+            if self.persistent_cache is not None and response.content_type == "application/json":
+                await self.persistent_cache.store(key, route, response.headers, body)
+        return self._handle_response(response, data)
+
+    def _revalidate_in_background(
+        self, key: Tuple, method: str, path: StrOrURL, retry: Optional[bool], kwargs: Dict
+    ) -> None:
+        if key in self._revalidations:
+            return
+        task = asyncio.ensure_future(
+            self._request(method, path, retry=retry, revalidate=True, **kwargs)
+        )
+        self._revalidations[key] = task
+
+        def _done(task: asyncio.Task) -> None:
+            self._revalidations.pop(key, None)
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(_done)
+
+    async def _send_with_retries(
+        self, method: str, path: StrOrURL, route: str, retry: Optional[bool], **kwargs
+    ) -> Tuple[ClientResponse, Any, bytes]:
+        """Sends a request, retrying it according to :attr:`retry_policy`.
+
+        Returns the final response, its decoded data and raw body, whatever its status.
+        """
+        from aiohttp import ClientConnectionError
+
+        policy = self.retry_policy
+        retryable = policy.allows(method) if retry is None else retry
+        breaker = self.circuit_breaker(route)
+
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                async with self.rate_limiter.limit(route):
+                    response, data, body = await self._send(method, path, **kwargs)
+                self.rate_limiter.update_from_headers(route, response.status, response.headers)
+            except (ClientConnectionError, asyncio.TimeoutError):
+                breaker.record_failure()
+                delay = policy.backoff(attempt) if retryable else None
+                if delay is None:
+                    raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                if response.status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                delay = None
+                if retryable and response.status in policy.retry_statuses:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    delay = policy.backoff(attempt, retry_after)
+                if delay is None:
+                    return response, data, body
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _send(
+        self, method: str, path: StrOrURL, **kwargs
+    ) -> Tuple[ClientResponse, Any, bytes]:
+        if (payload := kwargs.pop("json", None)) is not None:
+            kwargs["data"] = self.json_codec.dumps(payload)
+            kwargs["headers"] = {
+                "Content-Type": "application/json",
+                **(kwargs.get("headers") or {}),
+            }
+
+        started_at = time.perf_counter()
         async with self.session.request(method, path, **kwargs) as response:
+            body = await response.read()
+            self.metrics.observe(route_template(path), "total", time.perf_counter() - started_at)
+            return response, self._decode(response, body), body
+
+    def _decode(self, response: ClientResponse, body: bytes) -> Any:
+        if not body.strip():
+            return None
+        content_type = response.content_type
+        if content_type == "application/json" or content_type.endswith("+json"):
             try:
-                data = await response.json()
-            except ContentTypeError:
-                data = await response.text()
+                return self.json_codec.loads(body)
             except Exception:
-                data = None
-
-            if response.ok:
-                return data
-            elif response.status in {401, 403, 423}:
-                raise Forbidden(response, data)
-            elif response.status == 404:
-                raise NotFound(response, data)
-            else:
-                raise HTTPException(response, data)
+                return None
+        return body.decode(response.charset or "utf-8", errors="replace")
+
+    async def stream(self, method: str, path: StrOrURL, **kwargs) -> AsyncIterator[Any]:
+        """Sends a request and yields the items of the JSON array in the response as they arrive.
+
+        Unlike :meth:`request`, streamed requests aren't retried, cached or coalesced, as items
+        are handed out before the response is complete.
+        """
+        from aiohttp import ClientConnectionError
+
+        route = route_template(path)
+        breaker = self.circuit_breaker(route)
+        breaker.before_request()
+        started_at = time.perf_counter()
+        try:
+            async with self.rate_limiter.limit(route):
+                async with self.session.request(method, path, **kwargs) as response:
+                    self.rate_limiter.update_from_headers(route, response.status, response.headers)
+                    if response.status >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if not response.ok:
+                        body = await response.read()
+                        self._handle_response(response, self._decode(response, body))
+
+                    decoder = IncrementalArrayDecoder(self.json_codec.loads)
+                    async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                        for item in decoder.feed(chunk):
+                            yield item
+                    decoder.close()
+                    self.metrics.observe(route, "total", time.perf_counter() - started_at)
+        except (ClientConnectionError, asyncio.TimeoutError):
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if decoder.fallback is not None:
+            if isinstance(decoder.fallback, dict) and "results" in decoder.fallback:
+                decoder.fallback = decoder.fallback["results"]
+            if not isinstance(decoder.fallback, list):
+                raise HTTPException(response, decoder.fallback)
+            for item in decoder.fallback:
+                yield item
+
+    def _handle_response(self, response: ClientResponse, data: Any) -> Any:
+        if response.ok:
+            return data
+        elif response.status in {401, 403, 423}:
+            raise Forbidden(response, data)
+        elif response.status == 404:
+            raise NotFound(response, data)
+        else:
+            raise HTTPException(response, data)
 
     @abstractclassmethod
     def authenticate(self, **credentials) -> Union[Self, Coroutine[Any, Any, Self]]:
@@ -120,6 +377,7 @@ class BaseHTTPClient:
 
     async def __aenter__(self) -> Self:
         self._session = self._create_session()
+        await self.pool.warm_up(self.HOST)
         return self
 
     async def __aexit__(
@@ -128,4 +386,9 @@ class BaseHTTPClient:
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> None:
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        await asyncio.gather(*self._revalidations.values(), return_exceptions=True)
         await self._session.close()
+        if self._owns_pool:
+            await self.pool.close()
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Mapping, Optional
+
+if TYPE_CHECKING:
+    from aiohttp.typedefs import StrOrURL
+    from multidict import CIMultiDictProxy
+
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """Builds the headers asking the server to only send a body if it has changed."""
+    headers = {}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if last_modified is not None:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    revalidations: int
+    misses: int
+    stores: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    path: str
+    data: Any
+    size: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        return conditional_headers(self.etag, self.last_modified)
+
+
+class HTTPCache:
+    """An in-memory cache of GET responses, revalidated with conditional requests.
+
+    Responses carrying an ``ETag`` or ``Last-Modified`` header are stored, and the next request
+    for them is sent with ``If-None-Match`` / ``If-Modified-Since``. A ``304 Not Modified`` is
+    then answered from the cache without downloading or decoding the body again.
+
+    Responses without validators are only stored for routes with a TTL, and are served without
+    asking the server until it expires. A TTL on a route with validators likewise skips the
+    conditional request while the entry is fresh.
+
+    Entries are evicted least recently used first, once the cached bodies exceed ``max_bytes``.
+
+    Parameters
+    ----------
+    max_bytes: :class:`int`
+        The budget for cached bodies, measured by their size on the wire.
+    ttls: Optional[Mapping[:class:`str`, :class:`float`]]
+        Seconds to keep serving a route from the cache unconditionally, keyed on route templates
+        such as ``/api/v1/leaderboard/v1.1/total_xp/``
+        (see :func:`~trainerdex.api.http.routes.route_template`).
+    default_ttl: :class:`float`
+        The TTL for routes not in ``ttls``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: float = 0.0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttls: Dict[str, float] = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._revalidations = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    def ttl(self, route: str) -> float:
+        return self.ttls.get(route, self.default_ttl)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if entry.fresh:
+            self._hits += 1
+        return entry
+
+    def store(
+        self,
+        key: Hashable,
+        route: str,
+        headers: CIMultiDictProxy[str],
+        data: Any,
+        size: int,
+    ) -> None:
+        cache_control = headers.get("Cache-Control", "").lower()
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        ttl = self.ttl(route)
+
+        if "no-store" in cache_control or size > self.max_bytes:
+            self.discard(key)
+            return
+        if etag is None and last_modified is None and ttl <= 0:
+            self.discard(key)
+            return
+
+        self.discard(key)
+        self._entries[key] = CacheEntry(
+            path=key[1] if isinstance(key, tuple) else str(key),
+            data=data,
+            size=size,
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=time.monotonic() + ttl,
+        )
+        self._bytes += size
+        self._stores += 1
+        self._evict()
+
+    def revalidated(
+        self, key: Hashable, entry: CacheEntry, route: str, headers: CIMultiDictProxy[str]
+    ) -> Any:
+        """Marks ``entry`` as confirmed by a ``304 Not Modified`` and returns its data.
+
+        ``entry`` is the one whose validators were sent. It's stored again under ``key``, as it
+        may have been invalidated or evicted while the request was in flight.
+        """
+        entry.etag = headers.get("ETag", entry.etag)
+        entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+        entry.expires_at = time.monotonic() + self.ttl(route)
+        if self._entries.get(key) is not entry:
+            self.discard(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+        self._entries.move_to_end(key)
+        self._revalidations += 1
+        self._evict()
+        return entry.data
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, path: StrOrURL) -> None:
+        """Drops every entry for ``path``, whatever its query parameters."""
+        path = str(path)
+        for key in [key for key, entry in self._entries.items() if entry.path == path]:
+            self.discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._evictions += 1
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            revalidations=self._revalidations,
+            misses=self._misses,
+            stores=self._stores,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            bytes=self._bytes,
+            max_bytes=self.max_bytes,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
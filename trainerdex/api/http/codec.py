@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, Optional, Protocol, Type, runtime_checkable
+
+
+@runtime_checkable
+class JSONCodec(Protocol):
+    """Encodes request bodies and decodes response bodies."""
+
+    name: str
+
+    def dumps(self, obj: Any) -> bytes:
+        ...
+
+    def loads(self, data: bytes) -> Any:
+        ...
+
+
+class StdlibCodec:
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._dumps: Callable[[Any], bytes] = orjson.dumps
+        self._loads: Callable[[bytes], Any] = orjson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+
+class MsgspecCodec:
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+
+CODECS: Dict[str, Type[JSONCodec]] = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+    StdlibCodec.name: StdlibCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Returns the named codec, or the fastest one installed if ``name`` is None.
+
+    orjson is preferred, then msgspec, falling back to the standard library.
+    """
+    if name is not None:
+        return CODECS[name]()
+
+    for codec in CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            continue
+    return StdlibCodec()
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, DefaultDict, Dict, List, Sequence, Tuple
+
+from trainerdex.api.http.routes import route_template
+
+if TYPE_CHECKING:
+    from aiohttp.client import ClientSession
+    from aiohttp.tracing import (
+        TraceConnectionCreateEndParams,
+        TraceConnectionCreateStartParams,
+        TraceConnectionQueuedEndParams,
+        TraceConnectionQueuedStartParams,
+        TraceDnsResolveHostEndParams,
+        TraceDnsResolveHostStartParams,
+        TraceRequestChunkSentParams,
+        TraceRequestEndParams,
+        TraceRequestExceptionParams,
+        TraceRequestStartParams,
+        TraceResponseChunkReceivedParams,
+    )
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float("inf"),
+)
+PHASES = ("dns", "connect", "pool_wait", "ttfb", "total")
+
+
+@dataclass(frozen=True, slots=True)
+class HistogramSnapshot:
+    buckets: Tuple[float, ...]
+    counts: Tuple[int, ...]
+    count: int
+    sum: float
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimates the ``q`` quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[min(bisect_left(self.buckets, value), len(self.buckets) - 1)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self.buckets, tuple(self.counts), self.count, self.sum)
+
+
+@dataclass(frozen=True, slots=True)
+class RouteSnapshot:
+    route: str
+    requests: int
+    statuses: Dict[int, int]
+    errors: Dict[str, int]
+    bytes_sent: int
+    bytes_received: int
+    latency: Dict[str, HistogramSnapshot]
+
+
+class _RouteMetrics:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.requests = 0
+        self.statuses: Counter[int] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency: Dict[str, Histogram] = {phase: Histogram(buckets) for phase in PHASES}
+
+
+class ClientMetrics:
+    """Collects per-route request metrics using aiohttp's client tracing.
+
+    Requests are grouped by route template (see
+    :func:`~trainerdex.api.http.routes.route_template`), and for each the following is kept:
+
+    - latency histograms for DNS resolution, connecting, waiting on the pool, time to first
+      byte and the total time until the body was read
+    - bytes sent and received
+    - responses by status code, and exceptions by type
+
+    A metrics instance may be shared between clients, to aggregate them.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._routes: DefaultDict[str, _RouteMetrics] = defaultdict(
+            lambda: _RouteMetrics(self.buckets)
+        )
+
+        from aiohttp import TraceConfig
+
+        self.trace_config = TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_request_end.append(self._on_request_end)
+        self.trace_config.on_request_exception.append(self._on_request_exception)
+        self.trace_config.on_request_chunk_sent.append(self._on_request_chunk_sent)
+        self.trace_config.on_response_chunk_received.append(self._on_response_chunk_received)
+        self.trace_config.on_dns_resolvehost_start.append(self._on_dns_resolvehost_start)
+        self.trace_config.on_dns_resolvehost_end.append(self._on_dns_resolvehost_end)
+        self.trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        self.trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        self.trace_config.on_connection_queued_start.append(self._on_connection_queued_start)
+        self.trace_config.on_connection_queued_end.append(self._on_connection_queued_end)
+
+    def observe(self, route: str, phase: str, seconds: float) -> None:
+        self._routes[route].latency[phase].observe(seconds)
+
+    def snapshot(self) -> Dict[str, RouteSnapshot]:
+        """Returns a point-in-time copy of the metrics, keyed by route template."""
+        return {
+            route: RouteSnapshot(
+                route=route,
+                requests=metrics.requests,
+                statuses=dict(metrics.statuses),
+                errors=dict(metrics.errors),
+                bytes_sent=metrics.bytes_sent,
+                bytes_received=metrics.bytes_received,
+                latency={phase: hist.snapshot() for phase, hist in metrics.latency.items()},
+            )
+            for route, metrics in self._routes.items()
+        }
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+    def to_prometheus(self, prefix: str = "trainerdex_client") -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines: List[str] = [
+            f"# HELP {prefix}_requests_total Responses received, by status code.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        snapshot = self.snapshot()
+        for route, metrics in snapshot.items():
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f'{prefix}_requests_total{{route="{route}",status="{status}"}} {count}'
+                )
+
+        lines += [
+            f"# HELP {prefix}_request_errors_total Requests which raised, by exception type.",
+            f"# TYPE {prefix}_request_errors_total counter",
+        ]
+        for route, metrics in snapshot.items():
+            for error, count in sorted(metrics.errors.items()):
+                lines.append(
+                    f'{prefix}_request_errors_total{{route="{route}",error="{error}"}} {count}'
+                )
+
+        lines += [
+            f"# HELP {prefix}_bytes_total Bytes sent and received in request and response bodies.",
+            f"# TYPE {prefix}_bytes_total counter",
+        ]
+        for route, metrics in snapshot.items():
+            lines.append(
+                f'{prefix}_bytes_total{{route="{route}",direction="sent"}} {metrics.bytes_sent}'
+            )
+            lines.append(
+                f'{prefix}_bytes_total{{route="{route}",direction="received"}} '
+                f"{metrics.bytes_received}"
+            )
+
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds Request latency, by phase.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for route, metrics in snapshot.items():
+            for phase, hist in metrics.latency.items():
+                if not hist.count:
+                    continue
+                labels = f'route="{route}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} '
+                        f"{cumulative}"
+                    )
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    async def _on_request_start(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceRequestStartParams
+    ) -> None:
+        ctx.metrics_route = route_template(params.url.path)
+        ctx.metrics_started_at = time.perf_counter()
+        self._routes[ctx.metrics_route].requests += 1
+
+    async def _on_request_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceRequestEndParams
+    ) -> None:
+        metrics = self._routes[ctx.metrics_route]
+        metrics.statuses[params.response.status] += 1
+        metrics.latency["ttfb"].observe(time.perf_counter() - ctx.metrics_started_at)
+
+    async def _on_request_exception(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceRequestExceptionParams
+    ) -> None:
+        self._routes[ctx.metrics_route].errors[type(params.exception).__name__] += 1
+
+    async def _on_request_chunk_sent(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceRequestChunkSentParams
+    ) -> None:
+        self._routes[ctx.metrics_route].bytes_sent += len(params.chunk)
+
+    async def _on_response_chunk_received(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceResponseChunkReceivedParams,
+    ) -> None:
+        self._routes[ctx.metrics_route].bytes_received += len(params.chunk)
+
+    async def _on_dns_resolvehost_start(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceDnsResolveHostStartParams
+    ) -> None:
+        ctx.metrics_dns_at = time.perf_counter()
+
+    async def _on_dns_resolvehost_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceDnsResolveHostEndParams
+    ) -> None:
+        self.observe(ctx.metrics_route, "dns", time.perf_counter() - ctx.metrics_dns_at)
+
+    async def _on_connection_create_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionCreateStartParams,
+    ) -> None:
+        ctx.metrics_connect_at = time.perf_counter()
+
+    async def _on_connection_create_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        self.observe(ctx.metrics_route, "connect", time.perf_counter() - ctx.metrics_connect_at)
+
+    async def _on_connection_queued_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionQueuedStartParams,
+    ) -> None:
+        ctx.metrics_queued_at = time.perf_counter()
+
+    async def _on_connection_queued_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionQueuedEndParams
+    ) -> None:
+        self.observe(ctx.metrics_route, "pool_wait", time.perf_counter() - ctx.metrics_queued_at)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, ClassVar, Dict, Mapping, Optional, Tuple
+
+from trainerdex.api.http.cache import conditional_headers
+
+if TYPE_CHECKING:
+    from multidict import CIMultiDictProxy
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_path ON responses (path);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class PersistentCacheStats:
+    hits: int
+    stale_hits: int
+    revalidations: int
+    misses: int
+    stores: int
+    evictions: int
+
+
+@dataclass(frozen=True, slots=True)
+class PersistentEntry:
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        return conditional_headers(self.etag, self.last_modified)
+
+
+class SQLiteCache:
+    """A response cache kept in a SQLite database, so it survives restarts.
+
+    Many processes on the same host may share one database file. It's opened in WAL mode, and
+    every write is its own short transaction. Reads don't write: when entries were last used,
+    which decides what's evicted, is recorded in memory and written with the next store, or
+    once ``ACCESS_BATCH`` reads have built up.
+
+    An entry is served without contacting the server until its TTL expires. After that, for up
+    to ``max_stale`` seconds, it's still served straight away while the client revalidates it in
+    the background, so a freshly restarted process answers reads immediately. Beyond that, its
+    validators are used for a conditional request.
+
+    Parameters
+    ----------
+    path: Union[:class:`str`, :class:`os.PathLike`]
+        The database file. It's created if it doesn't exist.
+    max_bytes: :class:`int`
+        The budget for stored bodies. The least recently used entries are evicted beyond it.
+    ttls: Optional[Mapping[:class:`str`, :class:`float`]]
+        Seconds an entry is fresh for, keyed on route template.
+    default_ttl: :class:`float`
+        The TTL for routes not in ``ttls``.
+    max_stale: :class:`float`
+        How long after expiring an entry may still be served while it's revalidated.
+    max_age: :class:`float`
+        Entries older than this are deleted outright, validators or not.
+    namespace: :class:`str`
+        Prefixed to every key, so clients for different hosts or users can share a file.
+    """
+
+    ACCESS_BATCH: ClassVar[int] = 256
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: float = 60.0,
+        max_stale: float = 24 * 60 * 60,
+        max_age: float = 7 * 24 * 60 * 60,
+        namespace: str = "",
+    ) -> None:
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.ttls: Dict[str, float] = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self.max_age = max_age
+        self.namespace = namespace
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # key -> when it was last read, not yet written to the database
+        self._accessed: Dict[str, float] = {}
+        self._hits = 0
+        self._stale_hits = 0
+        self._revalidations = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    def ttl(self, route: str) -> float:
+        return self.ttls.get(route, self.default_ttl)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _key(self, key: Tuple) -> str:
+        return f"{self.namespace}{key!r}"
+
+    async def get(self, key: Tuple) -> Optional[PersistentEntry]:
+        entry = await asyncio.to_thread(self._get, self._key(key))
+        if entry is None:
+            self._misses += 1
+        elif entry.fresh:
+            self._hits += 1
+        elif time.time() < entry.expires_at + self.max_stale:
+            self._stale_hits += 1
+        return entry
+
+    def servable_stale(self, entry: PersistentEntry) -> bool:
+        return time.time() < entry.expires_at + self.max_stale
+
+    async def store(
+        self, key: Tuple, route: str, headers: CIMultiDictProxy[str], body: bytes
+    ) -> None:
+        if "no-store" in headers.get("Cache-Control", "").lower() or len(body) > self.max_bytes:
+            return
+        self._evictions += await asyncio.to_thread(
+            self._store,
+            self._key(key),
+            key[1],
+            body,
+            headers.get("ETag"),
+            headers.get("Last-Modified"),
+            self.ttl(route),
+        )
+        self._stores += 1
+
+    async def revalidated(self, key: Tuple, route: str, headers: CIMultiDictProxy[str]) -> None:
+        """Extends an entry's freshness after a ``304 Not Modified``."""
+        await asyncio.to_thread(
+            self._revalidated,
+            self._key(key),
+            headers.get("ETag"),
+            headers.get("Last-Modified"),
+            self.ttl(route),
+        )
+        self._revalidations += 1
+
+    async def invalidate(self, path: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM responses WHERE path = ?", (path,))
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM responses", ())
+
+    def stats(self) -> PersistentCacheStats:
+        """Counters for this process. Other processes sharing the file keep their own."""
+        return PersistentCacheStats(
+            hits=self._hits,
+            stale_hits=self._stale_hits,
+            revalidations=self._revalidations,
+            misses=self._misses,
+            stores=self._stores,
+            evictions=self._evictions,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                if self._accessed:
+                    self._write_accessed(self._connection)
+                self._connection.close()
+                self._connection = None
+
+    def _execute(self, sql: str, parameters: tuple) -> None:
+        with self._lock:
+            self.connection.execute(sql, parameters)
+
+    def _get(self, key: str) -> Optional[PersistentEntry]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT body, etag, last_modified, stored_at, expires_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= self.ACCESS_BATCH:
+                self._write_accessed(self.connection)
+        return PersistentEntry(*row)
+
+    def _write_accessed(self, connection: sqlite3.Connection) -> None:
+        """Writes the pending access times in one transaction."""
+        accessed, self._accessed = self._accessed, {}
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._update_accessed(connection, accessed)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _update_accessed(connection: sqlite3.Connection, accessed: Dict[str, float]) -> None:
+        connection.executemany(
+            "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in accessed.items()],
+        )
+
+    def _store(
+        self,
+        key: str,
+        path: str,
+        body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        ttl: float,
+    ) -> int:
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, path, body, etag, last_modified, stored_at, expires_at, accessed_at, "
+                    "size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, path, body, etag, last_modified, now, now + ttl, now, len(body)),
+                )
+                accessed, self._accessed = self._accessed, {}
+                self._update_accessed(connection, accessed)
+                evicted = self._evict(connection, now)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return evicted
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> int:
+        evicted = connection.execute(
+            "DELETE FROM responses WHERE stored_at < ?", (now - self.max_age,)
+        ).rowcount
+        (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return evicted
+
+        excess = total - self.max_bytes
+        for key, size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            evicted += 1
+            excess -= size
+            if excess <= 0:
+                break
+        return evicted
+
+    def _revalidated(
+        self, key: str, etag: Optional[str], last_modified: Optional[str], ttl: float
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE key = ?",
+                (now + ttl, now, etag, last_modified, key),
+            )
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional, Set
+
+if TYPE_CHECKING:
+    from aiohttp.client import ClientSession
+    from aiohttp.connector import TCPConnector
+    from aiohttp.tracing import (
+        TraceConnectionCreateEndParams,
+        TraceConnectionQueuedEndParams,
+        TraceConnectionQueuedStartParams,
+        TraceConnectionReuseconnParams,
+        TraceDnsCacheHitParams,
+        TraceDnsCacheMissParams,
+        TraceRequestEndParams,
+        TraceRequestExceptionParams,
+        TraceRequestStartParams,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    limit: int
+    limit_per_host: int
+    in_flight: int
+    connections_created: int
+    connections_reused: int
+    dns_cache_hits: int
+    dns_cache_misses: int
+    queued: int
+    queued_total: int
+    queued_seconds: float
+
+
+class ConnectionPool:
+    """A keep-alive connection pool which can be shared between many clients.
+
+    Pass the same pool to several clients to have them reuse each others connections, DNS
+    cache and TLS sessions. The pool outlives the clients using it and must be closed
+    explicitly, either with :meth:`close` or by using it as an async context manager.
+
+    Parameters
+    ----------
+    limit: :class:`int`
+        The total number of simultaneous connections. ``0`` means unlimited.
+    limit_per_host: :class:`int`
+        The number of simultaneous connections to a single host. ``0`` means unlimited.
+    keepalive_timeout: :class:`float`
+        How long, in seconds, an idle connection is kept open for reuse.
+    ttl_dns_cache: Optional[:class:`int`]
+        How long, in seconds, resolved hosts are cached. ``None`` caches forever.
+    pre_connect: :class:`int`
+        The number of connections to open ahead of time when a client first enters.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 60.0,
+        ttl_dns_cache: Optional[int] = 300,
+        pre_connect: int = 0,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.pre_connect = pre_connect
+
+        self._connector: Optional[TCPConnector] = None
+        self._warmed_up: Set[str] = set()
+
+        self._in_flight = 0
+        self._connections_created = 0
+        self._connections_reused = 0
+        self._dns_cache_hits = 0
+        self._dns_cache_misses = 0
+        self._queued = 0
+        self._queued_total = 0
+        self._queued_seconds = 0.0
+
+        from aiohttp import TraceConfig
+
+        self.trace_config = TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_request_end.append(self._on_request_done)
+        self.trace_config.on_request_exception.append(self._on_request_done)
+        self.trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        self.trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        self.trace_config.on_connection_queued_start.append(self._on_connection_queued_start)
+        self.trace_config.on_connection_queued_end.append(self._on_connection_queued_end)
+        self.trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        self.trace_config.on_dns_cache_miss.append(self._on_dns_cache_miss)
+
+    @property
+    def connector(self) -> TCPConnector:
+        """The underlying connector. It's created lazily, as it must be bound to a running
+        loop."""
+        if self._connector is None or self._connector.closed:
+            from aiohttp.connector import TCPConnector
+
+            self._connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+            )
+            self._warmed_up.clear()
+        return self._connector
+
+    @property
+    def closed(self) -> bool:
+        return self._connector is None or self._connector.closed
+
+    async def warm_up(self, base_url: str, connections: Optional[int] = None) -> None:
+        """Opens connections to ``base_url`` ahead of time, so the first requests skip the
+        DNS lookup and TLS handshake.
+
+        Each host is only warmed up once per connector. Failures are ignored, as the
+        connection will simply be made when it's first needed.
+        """
+        connections = self.pre_connect if connections is None else connections
+        if connections <= 0 or base_url in self._warmed_up:
+            return
+        self._warmed_up.add(base_url)
+
+        from aiohttp import ClientError, ClientSession
+
+        async with ClientSession(
+            base_url=base_url,
+            connector=self.connector,
+            connector_owner=False,
+            trace_configs=[self.trace_config],
+        ) as session:
+
+            async def _connect() -> None:
+                try:
+                    async with session.head("/", allow_redirects=False) as resp:
+                        await resp.release()
+                except (ClientError, asyncio.TimeoutError):
+                    pass
+
+            await asyncio.gather(*(_connect() for _ in range(connections)))
+
+    def stats(self) -> PoolStats:
+        """Returns a snapshot of the pool's counters."""
+        return PoolStats(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            in_flight=self._in_flight,
+            connections_created=self._connections_created,
+            connections_reused=self._connections_reused,
+            dns_cache_hits=self._dns_cache_hits,
+            dns_cache_misses=self._dns_cache_misses,
+            queued=self._queued,
+            queued_total=self._queued_total,
+            queued_seconds=self._queued_seconds,
+        )
+
+    async def close(self) -> None:
+        if self._connector is not None:
+            await self._connector.close()
+        self._connector = None
+        self._warmed_up.clear()
+
+    async def __aenter__(self) -> ConnectionPool:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def _on_request_start(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceRequestStartParams
+    ) -> None:
+        self._in_flight += 1
+
+    async def _on_request_done(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceRequestEndParams | TraceRequestExceptionParams,
+    ) -> None:
+        self._in_flight -= 1
+
+    async def _on_connection_create_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        self._connections_created += 1
+
+    async def _on_connection_reuseconn(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionReuseconnParams
+    ) -> None:
+        self._connections_reused += 1
+
+    async def _on_connection_queued_start(
+        self,
+        session: ClientSession,
+        ctx: SimpleNamespace,
+        params: TraceConnectionQueuedStartParams,
+    ) -> None:
+        self._queued += 1
+        self._queued_total += 1
+        ctx.pool_queued_at = time.monotonic()
+
+    async def _on_connection_queued_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionQueuedEndParams
+    ) -> None:
+        self._queued -= 1
+        self._queued_seconds += time.monotonic() - getattr(ctx, "pool_queued_at", time.monotonic())
+
+    async def _on_dns_cache_hit(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceDnsCacheHitParams
+    ) -> None:
+        self._dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceDnsCacheMissParams
+    ) -> None:
+        self._dns_cache_misses += 1
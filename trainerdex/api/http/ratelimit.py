@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Mapping, Optional, Tuple, Union
+
+from trainerdex.api.http.retry import parse_retry_after
+
+if TYPE_CHECKING:
+    from multidict import CIMultiDictProxy
+
+RouteLimit = Union[float, Tuple[float, float]]
+
+_LIMIT_HEADERS = ("X-RateLimit-Limit", "RateLimit-Limit")
+_REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+_RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset")
+
+
+def _first_float(headers: CIMultiDictProxy[str], names: Tuple[str, ...]) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            # Some servers send a list of policies, the first value is the one in effect
+            return float(value.split(",", 1)[0].split(";", 1)[0])
+        except ValueError:
+            continue
+    return None
+
+
+class TokenBucket:
+    """A token bucket refilling at ``rate`` tokens per second, holding at most ``capacity``.
+
+    Waiters are served in the order they arrive.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def tokens(self) -> float:
+        self._refill(time.monotonic())
+        return self._tokens
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    # The server's window has reset by now
+                    self._tokens = self.capacity
+                    self._updated = time.monotonic()
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float) -> None:
+        """Holds every waiter for ``seconds``, e.g. when the server says the limit is exhausted."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update(self, remaining: Optional[float] = None, reset: Optional[float] = None) -> None:
+        """Brings the bucket in line with the server's view of it."""
+        self._refill(time.monotonic())
+        if remaining is not None:
+            self._tokens = min(self._tokens, remaining)
+            if remaining < 1 and reset:
+                self.block(reset)
+
+    def __repr__(self) -> str:
+        return f"TokenBucket(rate={self.rate}, capacity={self.capacity}, tokens={self.tokens:.2f})"
+
+
+class RateLimiter:
+    """Client side rate limiting, applied to every request a client sends.
+
+    Parameters
+    ----------
+    rate: Optional[:class:`float`]
+        Requests per second allowed across all routes. ``None`` means unlimited.
+    burst: Optional[:class:`float`]
+        How many requests may be sent at once before ``rate`` applies. Defaults to ``rate``.
+    routes: Optional[Mapping[:class:`str`, Union[:class:`float`, Tuple[float, float]]]]
+        Per-route limits, keyed on route templates such as ``/api/v1/trainers/{id}/updates/``
+        (see :func:`~trainerdex.api.http.routes.route_template`). Values are either a rate or a
+        ``(rate, burst)`` tuple.
+    max_concurrency: Optional[:class:`int`]
+        The most requests allowed in flight at once. ``None`` means unlimited.
+    learn_from_headers: :class:`bool`
+        Whether to create and adjust buckets from ``X-RateLimit-*`` / ``RateLimit-*`` response
+        headers, and to hold a route back when it's answered with a 429.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        routes: Optional[Mapping[str, RouteLimit]] = None,
+        max_concurrency: Optional[int] = None,
+        learn_from_headers: bool = True,
+    ) -> None:
+        self.global_bucket: Optional[TokenBucket] = TokenBucket(rate, burst) if rate else None
+        self.route_buckets: Dict[str, TokenBucket] = {}
+        for route, limit in (routes or {}).items():
+            rate_, burst_ = limit if isinstance(limit, tuple) else (limit, None)
+            self.route_buckets[route] = TokenBucket(rate_, burst_)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.learn_from_headers = learn_from_headers
+
+    @asynccontextmanager
+    async def limit(self, route: str) -> AsyncIterator[None]:
+        """Waits until a request to ``route`` is allowed, holding a concurrency slot until exit."""
+        if self.global_bucket is not None:
+            await self.global_bucket.acquire()
+        if (bucket := self.route_buckets.get(route)) is not None:
+            await bucket.acquire()
+
+        if self._semaphore is None:
+            yield
+        else:
+            async with self._semaphore:
+                yield
+
+    def update_from_headers(self, route: str, status: int, headers: CIMultiDictProxy[str]) -> None:
+        if not self.learn_from_headers:
+            return
+
+        limit = _first_float(headers, _LIMIT_HEADERS)
+        remaining = _first_float(headers, _REMAINING_HEADERS)
+        reset = _first_float(headers, _RESET_HEADERS)
+        if reset is not None and reset > 1e9:
+            # An epoch timestamp rather than a number of seconds
+            reset = max(0.0, reset - time.time())
+
+        bucket = self.route_buckets.get(route)
+        if bucket is None and limit and reset:
+            bucket = self.route_buckets[route] = TokenBucket(limit / reset, limit)
+
+        if bucket is not None:
+            bucket.update(remaining, reset)
+
+        if status == 429 and (retry_after := parse_retry_after(headers.get("Retry-After"))):
+            for bucket in (bucket, self.global_bucket):
+                if bucket is not None:
+                    bucket.block(retry_after)
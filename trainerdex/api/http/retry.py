@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Literal, Optional
+
+from trainerdex.api.exceptions import CircuitOpen
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a ``Retry-After`` header, which is either a number of seconds or an HTTP-date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(tz=timezone.utc)).total_seconds())
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Configures how a client retries failed requests.
+
+    Parameters
+    ----------
+    max_attempts: :class:`int`
+        The total number of attempts, including the first. ``1`` disables retrying.
+    backoff_base: :class:`float`
+        The base delay, in seconds, which is doubled on every attempt.
+    backoff_max: :class:`float`
+        The upper bound on any single delay.
+    max_retry_after: :class:`float`
+        The longest ``Retry-After`` the client will wait for. Longer waits are raised instead.
+    retry_statuses: FrozenSet[:class:`int`]
+        The response statuses which are worth retrying.
+    methods: FrozenSet[:class:`str`]
+        The HTTP methods retried by default. POST and PATCH aren't idempotent so aren't included,
+        but can be opted in here, or per-call with ``request(..., retry=True)``.
+    circuit_breaker_threshold: :class:`int`
+        Consecutive failures on an endpoint before its circuit opens. ``0`` disables the breaker.
+    circuit_breaker_timeout: :class:`float`
+        How long, in seconds, an open circuit fails fast before letting a probe request through.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    max_retry_after: float = 60.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    methods: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_timeout: float = 30.0
+
+    def allows(self, method: str) -> bool:
+        return method.upper() in self.methods
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Returns how long to wait before the next attempt, or None if it shouldn't be retried.
+
+        ``attempt`` is zero-indexed. A server supplied ``retry_after`` takes precedence over the
+        exponential backoff, which uses full jitter so that concurrent retries spread out rather
+        than arriving together.
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Tracks the health of a single endpoint.
+
+    After ``threshold`` consecutive failures the circuit opens and requests fail fast with
+    :class:`~trainerdex.api.exceptions.CircuitOpen`. Once ``timeout`` has passed, a single probe
+    request is let through; its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, endpoint: str, threshold: int, timeout: float) -> None:
+        self.endpoint = endpoint
+        self.threshold = threshold
+        self.timeout = timeout
+        self.state: Literal["closed", "open", "half-open"] = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def before_request(self) -> None:
+        if not self.enabled:
+            return
+
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.timeout:
+                raise CircuitOpen(f"Circuit for {self.endpoint} is open")
+            self.state = "half-open"
+
+        if self.state == "half-open":
+            if self._probing:
+                raise CircuitOpen(f"Circuit for {self.endpoint} is half-open")
+            self._probing = True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+
+        self._probing = False
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Frees the probe slot when a request ended without a verdict on the endpoint's health."""
+        self._probing = False
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker({self.endpoint!r}, state={self.state!r}, failures={self.failures})"
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiohttp.typedefs import StrOrURL
+
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+_UUID_SEGMENT = re.compile(
+    r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$", re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=1024)
+def _route_template(path: str) -> str:
+    segments = []
+    for segment in path.split("/"):
+        if _ID_SEGMENT.match(segment):
+            segments.append("{id}")
+        elif _UUID_SEGMENT.match(segment):
+            segments.append("{uuid}")
+        else:
+            segments.append(segment)
+    return "/".join(segments)
+
+
+def route_template(path: StrOrURL) -> str:
+    """Collapses the variable parts of a path into a template.
+
+    Numeric segments become ``{id}`` and UUID segments become ``{uuid}``, so
+    ``/api/v1/trainers/1/updates/<uuid>/`` becomes ``/api/v1/trainers/{id}/updates/{uuid}/``.
+    This is used to key per-endpoint state, such as circuit breakers.
+    """
+    return _route_template(str(path).split("?", 1)[0])
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from aiohttp.typedefs import StrOrURL
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightStats:
+    calls: int
+    executed: int
+    coalesced: int
+    in_flight: int
+
+
+def request_key(method: str, path: StrOrURL, params: Optional[Any] = None) -> Tuple:
+    if params is None:
+        params = ()
+    elif isinstance(params, Mapping):
+        params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    else:
+        params = tuple((str(k), str(v)) for k, v in params)
+    return (method.upper(), str(path), params)
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one.
+
+    The first caller for a key starts the work. Anyone asking for the same key before it
+    finishes waits on that work instead of starting their own, and receives the same result,
+    or the same exception. The work runs in its own task, so cancelling any one waiter,
+    including the first, doesn't cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._total = 0
+        self._executed = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self._total += 1
+        task = self._calls.get(key)
+        if task is None:
+            self._executed += 1
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved, in case every waiter was cancelled
+            task.exception()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            calls=self._total,
+            executed=self._executed,
+            coalesced=self._coalesced,
+            in_flight=len(self._calls),
+        )
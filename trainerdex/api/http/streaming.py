@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, List, Optional
+
+_TOKENS = re.compile(rb'[\[\]{}",\\]')
+_STRING_TOKENS = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+
+
+class IncrementalArrayDecoder:
+    """Decodes the items of a top-level JSON array as the bytes arrive.
+
+    Only the structure of the document is scanned here, to find where each item starts and
+    ends. Each complete item is then handed to ``loads`` on its own, so memory use is bounded by
+    the size of an item, not the size of the response.
+
+    If the document turns out not to be an array, it's buffered and decoded whole, and
+    :attr:`fallback` holds the result once :meth:`close` is called.
+
+    >>> decoder = IncrementalArrayDecoder(json.loads)
+    >>> decoder.feed(b'[{"id": 1}, {"i')
+    [{'id': 1}]
+    >>> decoder.feed(b'd": 2}]')
+    [{'id': 2}]
+    """
+
+    def __init__(self, loads: Callable[[bytes], Any]) -> None:
+        self.loads = loads
+        self.fallback: Optional[Any] = None
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._item_start = 0
+        self._is_array: Optional[bool] = None
+        self._finished = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Adds ``chunk`` to the buffer and returns any items it completed."""
+        self._buffer += chunk
+        if self._is_array is None:
+            stripped = self._buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                return []
+            self._is_array = stripped[:1] == b"["
+        if not self._is_array or self._finished:
+            return []
+
+        items = []
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            if self._in_string:
+                match = _STRING_TOKENS.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == b"\\":
+                    # Skip whatever is escaped. It may not have arrived yet, hence the check below.
+                    pos = match.end() + 1
+                    if pos > len(buffer):
+                        pos = match.start()
+                        break
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _TOKENS.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            token, pos = match.group(), match.end()
+
+            if token == b'"':
+                self._in_string = True
+            elif token in (b"[", b"{"):
+                self._depth += 1
+                if self._depth == 1:
+                    self._item_start = pos
+            elif token in (b"]", b"}"):
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(items, match.start())
+                    self._finished = True
+                    break
+            elif token == b"," and self._depth == 1:
+                self._emit(items, match.start())
+                self._item_start = pos
+
+        # Drop what's been consumed, so the buffer only ever holds the item in progress
+        consumed = min(self._item_start, pos)
+        if consumed:
+            del buffer[:consumed]
+            self._item_start -= consumed
+            pos -= consumed
+        self._pos = pos
+        return items
+
+    def _emit(self, items: List[Any], end: int) -> None:
+        item = bytes(self._buffer[self._item_start : end])
+        if item.strip(_WHITESPACE):
+            items.append(self.loads(item))
+
+    def close(self) -> None:
+        """Signals the end of the document, raising if it was incomplete."""
+        if self._is_array:
+            if not self._finished:
+                raise ValueError("Truncated JSON array")
+        elif self._buffer.strip(_WHITESPACE):
+            self.fallback = self.loads(bytes(self._buffer))
+        self._buffer.clear()
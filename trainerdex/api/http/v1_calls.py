@@ -8,7 +8,9 @@ from trainerdex.api.http.auth.decorators import requires_authentication
 from trainerdex.api.http.base import BaseHTTPClient
 
 if TYPE_CHECKING:
-    from trainerdex.api.http.base import Response
+    from datetime import datetime
+
+    from trainerdex.api.http.base import Response, Stream
     from trainerdex.api.types.v1.social_connection import (
         CreateSocialConnection,
         ReadSocialConnection,
@@ -26,8 +28,21 @@ class APIV1Mixin(BaseHTTPClient):
     def _v1_get_update(self, trainer_id: int, uuid: StrOrUUID) -> Response[ReadUpdate]:
         return self.request("GET", f"/api/v1/trainers/{trainer_id}/updates/{uuid}/")
 
-    def _v1_get_updates_for_trainer(self, trainer_id: int) -> Response[List[ReadUpdate]]:
-        return self.request("GET", f"/api/v1/trainers/{trainer_id}/updates/")
+    def _v1_get_updates_for_trainer(
+        self, trainer_id: int, *, since: Optional[datetime] = None
+    ) -> Response[List[ReadUpdate]]:
+        """With ``since``, asks for only the updates after it. Servers which don't support the
+        filter ignore it and send them all."""
+        if since is None:
+            return self.request("GET", f"/api/v1/trainers/{trainer_id}/updates/")
+        return self.request(
+            "GET",
+            f"/api/v1/trainers/{trainer_id}/updates/",
+            params={"update_time__gt": since.isoformat()},
+        )
+
+    def _v1_iter_updates_for_trainer(self, trainer_id: int) -> Stream[ReadUpdate]:
+        return self.stream("GET", f"/api/v1/trainers/{trainer_id}/updates/")
 
     @requires_authentication
     def _v1_create_update(self, trainer_id: int, payload: CreateUpdate) -> Response[ReadUpdate]:
@@ -48,13 +63,21 @@ class APIV1Mixin(BaseHTTPClient):
     def _v1_get_trainers(
         self, *, t: Literal[0, 1, 2, 3] = None, q: str = None
     ) -> Response[List[ReadTrainer]]:
+        return self.request("GET", "/api/v1/trainers/", params=self._v1_trainers_params(t, q))
+
+    def _v1_iter_trainers(
+        self, *, t: Literal[0, 1, 2, 3] = None, q: str = None
+    ) -> Stream[ReadTrainer]:
+        return self.stream("GET", "/api/v1/trainers/", params=self._v1_trainers_params(t, q))
+
+    @staticmethod
+    def _v1_trainers_params(t: Optional[int], q: Optional[str]) -> Dict[str, Union[int, str]]:
         params = {}
         if t is not None:
             params["t"] = t
         if q is not None:
             params["q"] = q
-
-        return self.request("GET", "/api/v1/trainers/", params=params)
+        return params
 
     @requires_authentication
     def _v1_create_trainer(self, payload: CreateTrainer) -> Response[ReadTrainer]:
@@ -70,6 +93,9 @@ class APIV1Mixin(BaseHTTPClient):
     def _v1_get_users(self) -> Response[List[ReadUser]]:
         return self.request("GET", "/api/v1/users/")
 
+    def _v1_iter_users(self) -> Stream[ReadUser]:
+        return self.stream("GET", "/api/v1/users/")
+
     @requires_authentication
     def _v1_create_user(self, payload: CreateUser) -> Response[ReadUser]:
         return self.request("POST", "/api/v1/users/", json=payload)
@@ -108,6 +134,16 @@ class APIV1Mixin(BaseHTTPClient):
         community: Optional[str] = None,
         country: Optional[str] = None,
     ) -> Response[Dict]:
+        endpoint = self._v1_leaderboard_endpoint(stat, guild_id, community, country)
+        return self.request("GET", endpoint)
+
+    @staticmethod
+    def _v1_leaderboard_endpoint(
+        stat: str = "total_xp",
+        guild_id: Optional[int] = None,
+        community: Optional[str] = None,
+        country: Optional[str] = None,
+    ) -> str:
         if guild_id:
             endpoint = f"/api/v1/leaderboard/discord/{guild_id}/"
         elif community:
@@ -120,4 +156,4 @@ class APIV1Mixin(BaseHTTPClient):
         if stat:
             endpoint += f"{stat}/"
 
-        return self.request("GET", endpoint)
+        return endpoint
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class IdentityMapStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    live: int
+
+
+class IdentityMap:
+    """Keeps one object per record, so a trainer loaded twice is the same :class:`Trainer`.
+
+    Each model class has its own LRU of up to ``maxsize`` recently loaded objects, which lookups
+    made with ``cached=True`` are served from without a request until they're ``ttl`` seconds
+    old. Objects which have been evicted
+    or have expired are only held weakly, so while anything else still refers to one, loading
+    the record again updates that object in place rather than creating another.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        How many objects of each class are held for reuse. ``0`` disables reuse, although
+        objects still in use elsewhere are kept up to date.
+    ttl: Optional[:class:`float`]
+        Seconds an object is served for before it's fetched again. ``None`` never expires them.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # class -> key -> (object, when it was loaded), least recently used first
+        self._fresh: Dict[type, OrderedDict[Hashable, Tuple[Any, float]]] = {}
+        self._live: weakref.WeakValueDictionary[
+            Tuple[type, Hashable], Any
+        ] = weakref.WeakValueDictionary()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, cls: Type[T], key: Hashable) -> Optional[T]:
+        """The object for ``key``, if it was loaded recently enough to be served as it is."""
+        fresh = self._fresh.get(cls)
+        entry = fresh.get(key) if fresh is not None else None
+        if entry is not None:
+            obj, loaded_at = entry
+            if self.ttl is None or time.monotonic() - loaded_at < self.ttl:
+                fresh.move_to_end(key)
+                self._hits += 1
+                return obj
+            del fresh[key]
+            self._expirations += 1
+        self._misses += 1
+        return None
+
+    def peek(self, cls: Type[T], key: Hashable) -> Optional[T]:
+        """The object for ``key`` if it's in memory, however stale, without counting a lookup."""
+        return self._live.get((cls, key))
+
+    def load(self, cls: Type[T], key: Hashable, data: Any, factory: Callable[[], T]) -> T:
+        """Returns the object for ``key`` updated from ``data``, or a new one from ``factory``."""
+        obj = self._live.get((cls, key))
+        if obj is None:
+            obj = factory()
+            self._live[cls, key] = obj
+        else:
+            obj._update(data)
+
+        if self.maxsize > 0:
+            fresh = self._fresh.setdefault(cls, OrderedDict())
+            fresh[key] = (obj, time.monotonic())
+            fresh.move_to_end(key)
+            while len(fresh) > self.maxsize:
+                fresh.popitem(last=False)
+                self._evictions += 1
+        return obj
+
+    def discard(self, cls: type, key: Hashable) -> None:
+        """Forgets ``key``, so it's fetched again on next use and not updated in place."""
+        fresh = self._fresh.get(cls)
+        if fresh is not None:
+            fresh.pop(key, None)
+        self._live.pop((cls, key), None)
+
+    def clear(self) -> None:
+        self._fresh.clear()
+        self._live.clear()
+
+    def stats(self) -> IdentityMapStats:
+        return IdentityMapStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            size=sum(map(len, self._fresh.values())),
+            live=len(self._live),
+        )
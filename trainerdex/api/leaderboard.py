@@ -1,17 +1,43 @@
 from __future__ import annotations
 
 import datetime
-from typing import Any, Callable, Dict, Iterator, List, Optional, Union
-
-from dateutil.parser import parse
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 from trainerdex.api.base import BaseClass
 from trainerdex.api.faction import Faction
 from trainerdex.api.trainer import Trainer
-from trainerdex.api.utils import convert, maybe_coroutine
+from trainerdex.api.utils import LazyTimestamp, maybe_coroutine
+
+if TYPE_CHECKING:
+    from trainerdex.api.batch import BatchResult
+    from trainerdex.api.client.base import UpdateLoading
+    from trainerdex.api.snapshot import LeaderboardSnapshot
 
 
 class LeaderboardEntry(BaseClass):
+    _trainer: Optional[Trainer] = None
+
+    update_time = LazyTimestamp()
+
     def _update(self, data: Dict[str, Union[str, int, float]]) -> None:
         self.level: Optional[int] = data.get("level")
         self.position: int = data["position"]
@@ -19,7 +45,7 @@ class LeaderboardEntry(BaseClass):
         self.username: str = data["username"]
         self.faction_id: Optional[int] = data.get("faction", {}).get("id")
         self.value = data["value"]
-        self.update_time = convert(parse, data.get("last_updated"))
+        self._update_time = data.get("last_updated")
 
     def refresh_from_api(self) -> None:
         ...
@@ -33,14 +59,19 @@ class LeaderboardEntry(BaseClass):
     def last_updated(self) -> Optional[datetime.datetime]:
         return self.update_time
 
+    @property
+    def trainer(self) -> Optional[Trainer]:
+        """The trainer, if they've been attached by :meth:`BaseLeaderboard.prefetch_trainers`."""
+        return self._trainer
+
     async def get_trainer(self) -> Trainer:
-        if getattr(self, "_trainer", None) is None:
-            self._trainer = await self.client.get_trainer(self.trainer_id)
+        if self._trainer is not None:
+            return self._trainer
 
-        return self._trainer
+        return await self.client.get_trainer(self.trainer_id)
 
     def __eq__(self, other) -> bool:
-        raise object.__eq__(self, other)
+        return object.__eq__(self, other)
 
     def __hash__(self):
         return object.__hash__(self)
@@ -61,10 +92,38 @@ class Aggregations:
         return self.__len__()
 
 
+@dataclass(frozen=True, slots=True)
+class _LeaderboardIndex:
+    """Where each row of a leaderboard is, by rank, position, trainer and username."""
+
+    order: List[int]  # rows, best position first
+    places: List[int]  # each row's place in order
+    by_position: Dict[int, List[int]]
+    by_trainer: Dict[int, int]
+    by_username: Dict[str, int]
+
+    @classmethod
+    def build(cls, rows: List[Dict[str, Any]]) -> _LeaderboardIndex:
+        positions = [row["position"] for row in rows]
+        order = sorted(range(len(rows)), key=positions.__getitem__)
+        places = [0] * len(rows)
+        by_position: Dict[int, List[int]] = {}
+        by_trainer: Dict[int, int] = {}
+        by_username: Dict[str, int] = {}
+        for place, row in enumerate(order):
+            places[row] = place
+            by_position.setdefault(positions[row], []).append(row)
+            by_trainer.setdefault(rows[row]["id"], row)
+            by_username.setdefault(rows[row]["username"].casefold(), row)
+        return cls(order, places, by_position, by_trainer, by_username)
+
+
 class BaseLeaderboard(BaseClass):
     def _update(self, data: Dict[str, Any]) -> None:
-        self.index = 0
         self._entries: List[Dict] = data["leaderboard"]
+        # Entry objects are made on first use, and kept so every view shares them
+        self._entry_objects: List[Optional[LeaderboardEntry]] = [None] * len(self._entries)
+        self._index: Optional[_LeaderboardIndex] = None
         self.title: str = data.get("title", "Global Leaderboard")
         self.stat: str = data.get("stat")
         self._aggregations: Dict = data.get("aggregations", {})
@@ -73,15 +132,21 @@ class BaseLeaderboard(BaseClass):
     def refresh_from_api(self) -> None:
         ...
 
-    def __aiter__(self):
-        return self
+    def __aiter__(self) -> AsyncIterator[LeaderboardEntry]:
+        """Each iteration is independent, so the leaderboard can be iterated any number of
+        times, including concurrently."""
+        return _stream(self._entry(index) for index in range(len(self._entries)))
+
+    def __iter__(self) -> Iterator[LeaderboardEntry]:
+        return (self._entry(index) for index in range(len(self._entries)))
 
-    async def __anext__(self) -> LeaderboardEntry:
-        index = self.index
-        if index >= len(self._entries):
-            raise StopAsyncIteration
-        self.index += 1
-        return LeaderboardEntry(client=self.client, data=self._entries[index])
+    def _entry(self, index: int) -> LeaderboardEntry:
+        entry = self._entry_objects[index]
+        if entry is None:
+            entry = self._entry_objects[index] = LeaderboardEntry(
+                client=self.client, data=self._entries[index]
+            )
+        return entry
 
     def __len__(self) -> int:
         return self.aggregations.count
@@ -89,56 +154,149 @@ class BaseLeaderboard(BaseClass):
     def __length_hint__(self) -> int:
         return self.__len__()
 
-    def __getitem__(self, key) -> List[LeaderboardEntry]:
-        """Retrieves a list of :class:`.LeaderboardEntry` in a position.
+    @property
+    def _indexes(self) -> _LeaderboardIndex:
+        # Built on the first lookup
+        if self._index is None:
+            self._index = _LeaderboardIndex.build(self._entries)
+        return self._index
+
+    @overload
+    def __getitem__(self, key: int) -> List[LeaderboardEntry]:
+        ...
+
+    @overload
+    def __getitem__(self, key: slice) -> List[LeaderboardEntry]:
+        ...
+
+    def __getitem__(self, key):
+        """Retrieves a list of :class:`.LeaderboardEntry` in a position, or with a slice, the
+        entries in that range of places in ranking order, as from a list.
 
         .. note::
 
             There can be multiple :class:`.LeaderboardEntry` for a position.
             This happens when they both have the same stat.
         """
-        return [
-            LeaderboardEntry(client=self.client, data=entry)
-            for entry in self._entries
-            if entry.get("position") == key
-        ]
+        if isinstance(key, slice):
+            return [self._entry(row) for row in self._indexes.order[key]]
+        return [self._entry(row) for row in self._indexes.by_position.get(key, ())]
+
+    def page(self, number: int, size: int = 25) -> List[LeaderboardEntry]:
+        """The entries on page ``number``, counting from 1, with ``size`` entries a page."""
+        if number < 1:
+            raise ValueError("Pages are numbered from 1")
+        return self[(number - 1) * size : number * size]
+
+    def get_entry(self, trainer_id: int) -> Optional[LeaderboardEntry]:
+        """The best placed entry of the trainer with ``trainer_id``, if they're on the board."""
+        row = self._indexes.by_trainer.get(trainer_id)
+        return None if row is None else self._entry(row)
+
+    def get_entry_by_username(self, username: str) -> Optional[LeaderboardEntry]:
+        """The entry of the trainer called ``username``, ignoring case."""
+        row = self._indexes.by_username.get(username.casefold())
+        return None if row is None else self._entry(row)
+
+    def around(self, trainer_id: int, k: int = 5) -> List[LeaderboardEntry]:
+        """The trainer's entry with up to ``k`` entries ranked either side of it, or an empty
+        list if they're not on the board."""
+        indexes = self._indexes
+        row = indexes.by_trainer.get(trainer_id)
+        if row is None:
+            return []
+        place = indexes.places[row]
+        return self[max(place - k, 0) : place + k + 1]
+
+    def snapshot(self) -> LeaderboardSnapshot:
+        """Each trainer's position and value, to compare with another snapshot later.
+
+        A trainer with several entries is recorded at their best position.
+        """
+        from trainerdex.api.snapshot import LeaderboardSnapshot
 
-    def filter(self, predicate) -> Iterator[LeaderboardEntry]:
-        """Filter the iterable with an (optionally async) predicate.
+        indexes = self._indexes
+        rows = self._entries
+        return LeaderboardSnapshot.from_rows(
+            self.stat,
+            [
+                (rows[row]["id"], rows[row]["position"], rows[row]["value"])
+                for row in indexes.order
+                if indexes.by_trainer[rows[row]["id"]] == row
+            ],
+        )
+
+    def view(self) -> LeaderboardView:
+        """A :class:`LeaderboardView` of every entry, to filter, sort and slice."""
+        return LeaderboardView(self)
+
+    def filter(self, predicate: Callable[[LeaderboardEntry], Any]) -> LeaderboardView:
+        """Filter the leaderboard with an (optionally async) predicate.
+
+        The leaderboard itself is left as it is.
 
         Parameters
         ----------
-        function: Callable
-            A function or coroutine function which takes one item of ``iterable``
-            as an argument, and returns ``True`` or ``False``.
+        predicate: Callable
+            A function or coroutine function which takes a :class:`LeaderboardEntry`, and
+            returns ``True`` or ``False``.
 
         Returns
         -------
-            An object which can either be awaited to yield a list of the filtered
-            items, or can also act as an async iterator to yield items one by one.
+        :class:`LeaderboardView`
+            The matching entries, which can be awaited for a list, or iterated asynchronously.
 
         Examples
         --------
-        >>> from tdx.leaderboard import Leaderboard
-        >>> def predicate(value):
-        ...     return value.faction.id == 0
-        >>> iterator = Leaderboard()
-        >>> async for i in iterator.filter(predicate):
-        ...     print(i)
-
+        >>> def predicate(entry):
+        ...     return entry.faction.id == 0
+        >>> async for entry in leaderboard.filter(predicate):
+        ...     print(entry)
 
-        >>> from redbot.core.utils import AsyncIter
-        >>> def predicate(value):
-        ...     return value.level.level < 5
-        >>> iterator = AsyncIter([1, 10, 5, 100])
-        >>> await iterator.filter(predicate)
-        [1, 5]
+        >>> await leaderboard.filter(lambda e: e.level < 40).sort(lambda e: e.username)[:10]
+        [<LeaderboardEntry>, ...]
+        """
+        return self.view().filter(predicate)
+
+    async def prefetch_trainers(
+        self,
+        limit: Optional[int] = None,
+        *,
+        start: int = 1,
+        concurrency: int = 10,
+        updates: Optional[UpdateLoading] = None,
+    ) -> List[BatchResult[Trainer]]:
+        """|coro|
+
+        Fetches the trainers of the entries at positions ``start`` to ``start + limit - 1``, or
+        to the end without a ``limit``, at most ``concurrency`` at a time.
+
+        Each trainer is fetched once, however many entries they have, and attached to their
+        entries, so :attr:`LeaderboardEntry.trainer` is set and
+        :meth:`LeaderboardEntry.get_trainer` needs no request. Entries already carry the level,
+        so to show teams or trainer codes, pass ``updates="lazy"`` to skip fetching histories.
 
+        Returns
+        -------
+        List[:class:`~trainerdex.api.batch.BatchResult`]
+            One result per trainer, keyed by their ID. A trainer who couldn't be fetched has
+            the error instead, and their entries are left as they were.
         """
-        self._entries = [
-            x for x in self._entries if predicate(LeaderboardEntry(client=self.client, data=x))
+        end = math.inf if limit is None else start + limit
+        indices = [
+            index for index, entry in enumerate(self._entries) if start <= entry["position"] < end
         ]
-        return self
+        trainer_ids = dict.fromkeys(self._entries[index]["id"] for index in indices)
+
+        async with self.client.batch(concurrency) as batch:
+            batch.map(partial(self.client.get_trainer, updates=updates), trainer_ids)
+            results = await batch.results()
+
+        trainers = {result.key: result.value for result in results if result.ok}
+        for index in indices:
+            entry = self._entry(index)
+            entry._trainer = trainers.get(entry.trainer_id, entry._trainer)
+        return results
 
     async def find(
         self, predicate: Callable, default: Optional[LeaderboardEntry] = None
@@ -163,22 +321,184 @@ class BaseLeaderboard(BaseClass):
         >>> await Leaderboard().find(lambda x: x.trainer.id == 1)
         <LeaderboardEntry>
         """
-        while True:
-            try:
-                elem = await self.__anext__()
-            except StopAsyncIteration:
-                return default
-            ret = await maybe_coroutine(predicate, elem)
-            if ret:
-                return elem
+        return await self.view().find(predicate, default)
 
     def __eq__(self, other) -> bool:
-        raise object.__eq__(self, other)
+        return object.__eq__(self, other)
 
     def __hash__(self):
         return object.__hash__(self)
 
 
+class LeaderboardView:
+    """A lazily filtered, sorted and sliced selection of a leaderboard's entries.
+
+    Views are immutable. :meth:`filter`, :meth:`sort` and slicing each return a new view, and
+    nothing is evaluated until a view is iterated or awaited, which yields its entries one by
+    one as far as the operations allow. Each iteration starts afresh and is independent of any
+    other. Entries are the leaderboard's own, shared by every view of it.
+
+    Awaiting a view gives a list of its entries.
+    """
+
+    __slots__ = ("_leaderboard", "_operations")
+
+    def __init__(self, leaderboard: BaseLeaderboard, operations: Tuple[_Operation, ...] = ()):
+        self._leaderboard = leaderboard
+        self._operations = operations
+
+    def __repr__(self) -> str:
+        operations = ", ".join(operation.__name__ for operation, _ in self._operations)
+        return f"<LeaderboardView of {self._leaderboard!r} [{operations}]>"
+
+    def _then(self, operation: Callable[..., AsyncIterator], *args: Any) -> LeaderboardView:
+        return LeaderboardView(self._leaderboard, (*self._operations, (operation, args)))
+
+    def filter(self, predicate: Callable[[LeaderboardEntry], Any]) -> LeaderboardView:
+        """Keeps the entries ``predicate`` returns true for. It may be a coroutine function."""
+        return self._then(_filter, predicate)
+
+    def sort(
+        self, key: Optional[Callable[[LeaderboardEntry], Any]] = None, *, reverse: bool = False
+    ) -> LeaderboardView:
+        """Orders the entries by ``key``, or by position without one. The sort is stable."""
+        return self._then(_sort, key or _position, reverse)
+
+    def __getitem__(self, key: slice) -> LeaderboardView:
+        if not isinstance(key, slice):
+            raise TypeError("LeaderboardView can only be sliced")
+        if key.step == 0:
+            raise ValueError("slice step cannot be zero")
+        return self._then(_slice, key)
+
+    def __aiter__(self) -> AsyncIterator[LeaderboardEntry]:
+        stream = aiter(self._leaderboard)
+        for operation, args in self._operations:
+            stream = operation(stream, *args)
+        return stream
+
+    async def _list(self) -> List[LeaderboardEntry]:
+        return [entry async for entry in self]
+
+    def __await__(self) -> Generator[Any, None, List[LeaderboardEntry]]:
+        return self._list().__await__()
+
+    async def find(
+        self, predicate: Callable, default: Optional[LeaderboardEntry] = None
+    ) -> Optional[LeaderboardEntry]:
+        """The first entry ``predicate`` returns true for, evaluating no further."""
+        async for entry in self:
+            if await maybe_coroutine(predicate, entry):
+                return entry
+        return default
+
+
+_Operation = Tuple[Callable[..., AsyncIterator[LeaderboardEntry]], Tuple[Any, ...]]
+
+
+def _position(entry: LeaderboardEntry) -> int:
+    return entry.position
+
+
+async def _stream(entries: Iterable[LeaderboardEntry]) -> AsyncIterator[LeaderboardEntry]:
+    for entry in entries:
+        yield entry
+
+
+async def _filter(
+    stream: AsyncIterator[LeaderboardEntry], predicate: Callable
+) -> AsyncIterator[LeaderboardEntry]:
+    async for entry in stream:
+        if await maybe_coroutine(predicate, entry):
+            yield entry
+
+
+async def _sort(
+    stream: AsyncIterator[LeaderboardEntry], key: Callable, reverse: bool
+) -> AsyncIterator[LeaderboardEntry]:
+    entries = [entry async for entry in stream]
+    entries.sort(key=key, reverse=reverse)
+    for entry in entries:
+        yield entry
+
+
+async def _slice(
+    stream: AsyncIterator[LeaderboardEntry], key: slice
+) -> AsyncIterator[LeaderboardEntry]:
+    if any(bound is not None and bound < 0 for bound in (key.start, key.stop, key.step)):
+        # Counting from the end needs every entry first
+        for entry in [entry async for entry in stream][key]:
+            yield entry
+        return
+
+    start, stop, step = key.start or 0, key.stop, 1 if key.step is None else key.step
+    if stop is not None and stop <= start:
+        return
+    async for index, entry in _enumerate(stream):
+        if index >= start and (index - start) % step == 0:
+            yield entry
+        if stop is not None and index + 1 >= stop:
+            return
+
+
+async def _enumerate(stream: AsyncIterator[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    index = 0
+    async for item in stream:
+        yield index, item
+        index += 1
+
+
+@dataclass(frozen=True, slots=True)
+class LeaderboardQuery:
+    """One leaderboard to fetch, as :meth:`~trainerdex.api.client.BaseClient.get_leaderboard`
+    takes it. Without a guild, community or country, it's the global leaderboard."""
+
+    stat: str = "total_xp"
+    guild_id: Optional[int] = None
+    community: Optional[str] = None
+    country: Optional[str] = None
+
+
+class LeaderboardCache:
+    """Keeps fetched leaderboards for ``ttl`` seconds, keyed by the endpoint they came from.
+
+    At most ``maxsize`` are kept, evicting the least recently used. A cached leaderboard is
+    handed to every caller as the same object, not a copy. Reading and filtering it leave it as
+    it is, but trainers attached to its entries by
+    :meth:`~BaseLeaderboard.prefetch_trainers` are seen by everyone sharing it.
+    """
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 256) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, Tuple[BaseLeaderboard, float]] = OrderedDict()
+
+    def get(self, endpoint: str) -> Optional[BaseLeaderboard]:
+        entry = self._entries.get(endpoint)
+        if entry is None:
+            return None
+        leaderboard, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[endpoint]
+            return None
+        self._entries.move_to_end(endpoint)
+        return leaderboard
+
+    def store(self, endpoint: str, leaderboard: BaseLeaderboard) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[endpoint] = (leaderboard, time.monotonic() + self.ttl)
+        self._entries.move_to_end(endpoint)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class Leaderboard(BaseLeaderboard):
     pass
 
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from trainerdex.api.history import _numpy
+
+
+def _ints(values: Sequence[int]) -> Any:
+    np = _numpy()
+    return np.array(values, dtype=np.int64) if np is not None else array("q", values)
+
+
+def _floats(values: Sequence[float]) -> Any:
+    np = _numpy()
+    return np.array(values, dtype=np.float64) if np is not None else array("d", values)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class LeaderboardSnapshot:
+    """Each trainer's position and value on a leaderboard at one moment, as compact arrays.
+
+    Take one with :meth:`~trainerdex.api.leaderboard.BaseLeaderboard.snapshot`, keep it with
+    :meth:`to_dict`, and compare it with a later one with :meth:`diff`. Trainers are in ranking
+    order, each once. The arrays are NumPy's when it's installed, and :class:`array.array`
+    otherwise.
+
+    Snapshots are equal when their stat, time and rows are. Like their arrays, they aren't
+    hashable.
+    """
+
+    stat: Optional[str]
+    taken_at: datetime.datetime
+    trainer_ids: Any
+    positions: Any
+    values: Any
+
+    @classmethod
+    def from_rows(
+        cls,
+        stat: Optional[str],
+        rows: Sequence[Tuple[int, int, float]],
+        taken_at: Optional[datetime.datetime] = None,
+    ) -> LeaderboardSnapshot:
+        """Builds a snapshot from ``(trainer id, position, value)`` rows, in ranking order."""
+        return cls(
+            stat=stat,
+            taken_at=taken_at or datetime.datetime.now(datetime.timezone.utc),
+            trainer_ids=_ints([row[0] for row in rows]),
+            positions=_ints([row[1] for row in rows]),
+            values=_floats([row[2] for row in rows]),
+        )
+
+    __hash__ = None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LeaderboardSnapshot):
+            return NotImplemented
+        return (
+            self.stat == other.stat
+            and self.taken_at == other.taken_at
+            and list(self.trainer_ids) == list(other.trainer_ids)
+            and list(self.positions) == list(other.positions)
+            and list(self.values) == list(other.values)
+        )
+
+    def __len__(self) -> int:
+        return len(self.trainer_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The snapshot as JSON serialisable data, which :meth:`from_dict` reads back."""
+        return {
+            "stat": self.stat,
+            "taken_at": self.taken_at.isoformat(),
+            "trainer_ids": list(map(int, self.trainer_ids)),
+            "positions": list(map(int, self.positions)),
+            "values": list(map(float, self.values)),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> LeaderboardSnapshot:
+        return cls(
+            stat=data["stat"],
+            taken_at=datetime.datetime.fromisoformat(data["taken_at"]),
+            trainer_ids=_ints(data["trainer_ids"]),
+            positions=_ints(data["positions"]),
+            values=_floats(data["values"]),
+        )
+
+    def diff(self, previous: LeaderboardSnapshot) -> LeaderboardDiff:
+        """What changed between ``previous`` and this snapshot."""
+        return LeaderboardDiff.between(previous, self)
+
+
+@dataclass(frozen=True, slots=True)
+class RankChange:
+    trainer_id: int
+    old_position: int
+    new_position: int
+    old_value: float
+    new_value: float
+
+    @property
+    def rank_change(self) -> int:
+        """Places moved up, negative for places moved down."""
+        return self.old_position - self.new_position
+
+    @property
+    def value_change(self) -> float:
+        return self.new_value - self.old_value
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class LeaderboardDiff:
+    """The changes between two :class:`LeaderboardSnapshot`.
+
+    Trainers on both boards are joined by ID. Their arrays line up with ``trainer_ids``, in
+    ranking order of the newer snapshot. ``rank_changes`` counts places moved up, so a trainer
+    who dropped from 3rd to 5th has ``-2``.
+
+    Attributes
+    ----------
+    joined: List[:class:`int`]
+        Trainers only on the newer board, in its ranking order.
+    dropped: List[:class:`int`]
+        Trainers only on the older board, in its ranking order.
+    """
+
+    old: LeaderboardSnapshot
+    new: LeaderboardSnapshot
+    trainer_ids: Any
+    old_positions: Any
+    new_positions: Any
+    old_values: Any
+    new_values: Any
+    rank_changes: Any
+    value_changes: Any
+    joined: List[int]
+    dropped: List[int]
+
+    @classmethod
+    def between(cls, old: LeaderboardSnapshot, new: LeaderboardSnapshot) -> LeaderboardDiff:
+        np = _numpy()
+        if np is not None:
+            return cls._join_numpy(np, old, new)
+        return cls._join(old, new)
+
+    @classmethod
+    def _join_numpy(
+        cls, np: Any, old: LeaderboardSnapshot, new: LeaderboardSnapshot
+    ) -> LeaderboardDiff:
+        old_ids = np.asarray(old.trainer_ids)
+        new_ids = np.asarray(new.trainer_ids)
+        order = np.argsort(old_ids, kind="stable")
+        sorted_ids = old_ids[order]
+        found_at = np.searchsorted(sorted_ids, new_ids).clip(max=max(len(sorted_ids) - 1, 0))
+        found = (
+            sorted_ids[found_at] == new_ids
+            if len(sorted_ids)
+            else np.zeros(len(new_ids), dtype=bool)
+        )
+        old_rows = order[found_at[found]]
+        new_rows = np.flatnonzero(found)
+        matched = np.zeros(len(old_ids), dtype=bool)
+        matched[old_rows] = True
+
+        old_positions = np.asarray(old.positions)[old_rows]
+        new_positions = np.asarray(new.positions)[new_rows]
+        old_values = np.asarray(old.values)[old_rows]
+        new_values = np.asarray(new.values)[new_rows]
+        return cls(
+            old=old,
+            new=new,
+            trainer_ids=new_ids[new_rows],
+            old_positions=old_positions,
+            new_positions=new_positions,
+            old_values=old_values,
+            new_values=new_values,
+            rank_changes=old_positions - new_positions,
+            value_changes=new_values - old_values,
+            joined=new_ids[~found].tolist(),
+            dropped=old_ids[~matched].tolist(),
+        )
+
+    @classmethod
+    def _join(cls, old: LeaderboardSnapshot, new: LeaderboardSnapshot) -> LeaderboardDiff:
+        old_rows = {trainer_id: row for row, trainer_id in enumerate(old.trainer_ids)}
+        pairs = [
+            (old_rows[trainer_id], row)
+            for row, trainer_id in enumerate(new.trainer_ids)
+            if trainer_id in old_rows
+        ]
+        old_positions = array("q", (old.positions[o] for o, _ in pairs))
+        new_positions = array("q", (new.positions[n] for _, n in pairs))
+        old_values = array("d", (old.values[o] for o, _ in pairs))
+        new_values = array("d", (new.values[n] for _, n in pairs))
+        new_ids = set(new.trainer_ids)
+        return cls(
+            old=old,
+            new=new,
+            trainer_ids=array("q", (new.trainer_ids[n] for _, n in pairs)),
+            old_positions=old_positions,
+            new_positions=new_positions,
+            old_values=old_values,
+            new_values=new_values,
+            rank_changes=array("q", (o - n for o, n in zip(old_positions, new_positions))),
+            value_changes=array("d", (n - o for o, n in zip(old_values, new_values))),
+            joined=[trainer_id for trainer_id in new.trainer_ids if trainer_id not in old_rows],
+            dropped=[trainer_id for trainer_id in old.trainer_ids if trainer_id not in new_ids],
+        )
+
+    def __len__(self) -> int:
+        return len(self.trainer_ids)
+
+    def __iter__(self) -> Iterator[RankChange]:
+        return map(self._change, range(len(self)))
+
+    def _change(self, row: int) -> RankChange:
+        return RankChange(
+            trainer_id=int(self.trainer_ids[row]),
+            old_position=int(self.old_positions[row]),
+            new_position=int(self.new_positions[row]),
+            old_value=float(self.old_values[row]),
+            new_value=float(self.new_values[row]),
+        )
+
+    def get(self, trainer_id: int) -> Optional[RankChange]:
+        """The change for ``trainer_id``, if they're on both boards."""
+        np = _numpy()
+        if np is not None:
+            rows = np.flatnonzero(np.asarray(self.trainer_ids) == trainer_id)
+            return self._change(int(rows[0])) if len(rows) else None
+        try:
+            return self._change(self.trainer_ids.index(trainer_id))
+        except ValueError:
+            return None
+
+    def climbers(self, n: int = 10) -> List[RankChange]:
+        """The ``n`` trainers who moved up the most places, best first."""
+        return self._top(self.rank_changes, n, 1)
+
+    def fallers(self, n: int = 10) -> List[RankChange]:
+        """The ``n`` trainers who moved down the most places, worst first."""
+        return self._top(self.rank_changes, n, -1)
+
+    def gainers(self, n: int = 10) -> List[RankChange]:
+        """The ``n`` trainers whose value grew the most, most first."""
+        return self._top(self.value_changes, n, 1)
+
+    def _top(self, changes: Any, n: int, sign: int) -> List[RankChange]:
+        """The rows with the ``n`` largest ``changes * sign`` above zero, ties in ranking
+        order."""
+        np = _numpy()
+        if np is not None:
+            keys = np.asarray(changes) * -sign
+            rows = np.argsort(keys, kind="stable")[:n]
+            rows = rows[keys[rows] < 0].tolist()
+        else:
+            rows = sorted(
+                (row for row in range(len(changes)) if changes[row] * sign > 0),
+                key=lambda row: changes[row] * -sign,
+            )[:n]
+        return [self._change(row) for row in rows]
@@ -0,0 +1,11 @@
+from typing import TYPE_CHECKING
+
+from trainerdex.api.utils import lazy_exports
+
+if TYPE_CHECKING:
+    from .dataset import Dataset
+    from .server import FakeTrainerDexServer
+
+__getattr__, __dir__ = lazy_exports(
+    __name__, {"Dataset": ".dataset", "FakeTrainerDexServer": ".server"}
+)
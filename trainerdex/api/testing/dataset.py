@@ -0,0 +1,209 @@
+"""Deterministic synthetic data shaped like real TrainerDex API responses."""
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from trainerdex.api.types.v1.update import Update as UpdateStats
+
+STATS = [stat for stat in UpdateStats.__annotations__ if stat not in ("total_xp", "travel_km")]
+DATA_SOURCES = ["ss_ocr", "ss_generic", "com.pokemongo.nianticlabs", "?"]
+COMMUNITIES = ["bristol", "cardiff", "london", "manchester", "swansea"]
+COUNTRIES = ["GB", "IE", "US", "CA", "AU"]
+EPOCH = datetime(2016, 7, 6, tzinfo=timezone.utc)
+
+
+def random_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def random_timestamp(rng: random.Random, after: datetime = EPOCH) -> str:
+    return (after + timedelta(seconds=rng.randrange(0, 60 * 60 * 24 * 365 * 6))).isoformat()
+
+
+def user(rng: random.Random, i: int) -> Dict[str, Any]:
+    return {"id": i, "uuid": random_uuid(rng), "username": f"trainer{i}", "trainer": i}
+
+
+def trainer(rng: random.Random, i: int) -> Dict[str, Any]:
+    created = random_timestamp(rng)
+    return {
+        "id": i,
+        "uuid": random_uuid(rng),
+        "created_at": created,
+        "updated_at": random_timestamp(rng),
+        "last_modified": random_timestamp(rng),
+        "has_cheated": False,
+        "currently_banned": False,
+        "owner": i,
+        "username": f"Trainer{i}",
+        "start_date": created[:10],
+        "faction": rng.randrange(0, 4),
+        "trainer_code": f"{rng.randrange(10**11, 10**12)}",
+        "last_cheated": None,
+        "daily_goal": None,
+        "total_goal": None,
+        "verified": True,
+        "statistics": True,
+        "update_set": [],
+    }
+
+
+def update(rng: random.Random, trainer_id: int, sparse: float = 0.6) -> Dict[str, Any]:
+    """An update where roughly ``sparse`` of the stats are absent, as most updates are partial."""
+    data: Dict[str, Any] = {
+        "uuid": random_uuid(rng),
+        "trainer": trainer_id,
+        "update_time": random_timestamp(rng),
+        "total_xp": rng.randrange(0, 200_000_000),
+        "trainer_level": rng.randrange(1, 51),
+        "travel_km": f"{rng.uniform(0, 50_000):.2f}",
+        "data_source": rng.choice(DATA_SOURCES),
+    }
+    for stat in STATS:
+        if stat != "trainer_level" and rng.random() > sparse:
+            data[stat] = rng.randrange(0, 100_000)
+    return data
+
+
+def leaderboard_entry(rng: random.Random, position: int) -> Dict[str, Any]:
+    return {
+        "position": position,
+        "id": rng.randrange(1, 10**6),
+        "username": f"Trainer{position}",
+        "faction": {"id": rng.randrange(0, 4)},
+        "value": 200_000_000 - position * 1000,
+        "level": rng.randrange(1, 51),
+        "last_updated": random_timestamp(rng),
+    }
+
+
+def discord_config(rng: random.Random, guild_id: int) -> Dict[str, Any]:
+    return {
+        "id": guild_id,
+        "name": f"Guild {guild_id}",
+        "language": "en",
+        "timezone": "UTC",
+        "assign_roles_on_join": True,
+        "set_nickname_on_join": True,
+        "set_nickname_on_update": True,
+        "level_format": rng.choice(["none", "int", "circled_level"]),
+        "weekly_leaderboards_enabled": rng.random() < 0.5,
+        "mystic_role": rng.randrange(10**17, 10**18),
+        "valor_role": rng.randrange(10**17, 10**18),
+        "instinct_role": rng.randrange(10**17, 10**18),
+        "tl40_role": rng.randrange(10**17, 10**18),
+        "tl50_role": rng.randrange(10**17, 10**18),
+        "leaderboard_channel": rng.randrange(10**17, 10**18),
+        "roles_to_append_on_approval": [],
+        "roles_to_remove_on_approval": [],
+        "mod_role_ids": [],
+    }
+
+
+@dataclass
+class Dataset:
+    """A self-consistent set of users, trainers, updates, social connections and guilds.
+
+    The same arguments always generate the same data.
+    """
+
+    users: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    trainers: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    updates: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+    social_connections: List[Dict[str, Any]] = field(default_factory=list)
+    configs: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    guild_members: Dict[int, List[int]] = field(default_factory=dict)
+    communities: Dict[str, List[int]] = field(default_factory=dict)
+    countries: Dict[str, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def generate(
+        cls,
+        trainers: int = 1000,
+        updates_per_trainer: int = 5,
+        guilds: int = 10,
+        seed: int = 0,
+    ) -> Dataset:
+        rng = random.Random(seed)
+        dataset = cls()
+        guild_ids = [10**17 + i for i in range(1, guilds + 1)]
+        for guild_id in guild_ids:
+            dataset.configs[guild_id] = discord_config(rng, guild_id)
+            dataset.guild_members[guild_id] = []
+
+        for i in range(1, trainers + 1):
+            dataset.users[i] = user(rng, i)
+            dataset.trainers[i] = trainer(rng, i)
+            dataset.updates[i] = sorted(
+                (update(rng, i) for _ in range(rng.randint(1, 2 * updates_per_trainer))),
+                key=lambda u: u["update_time"],
+            )
+            dataset.social_connections.append(
+                {
+                    "user": i,
+                    "provider": "discord",
+                    "uid": str(10**17 + 10**6 + i),
+                    "extra_data": "{}",
+                    "trainer": i,
+                }
+            )
+            if guild_ids:
+                dataset.guild_members[rng.choice(guild_ids)].append(i)
+            dataset.communities.setdefault(rng.choice(COMMUNITIES), []).append(i)
+            dataset.countries.setdefault(rng.choice(COUNTRIES), []).append(i)
+        return dataset
+
+    def latest_value(self, trainer_id: int, stat: str) -> Optional[Any]:
+        for data in reversed(self.updates.get(trainer_id, [])):
+            if data.get(stat) is not None:
+                return data[stat]
+        return None
+
+    def leaderboard(
+        self, stat: str = "total_xp", members: Optional[List[int]] = None, **extra: Any
+    ) -> Dict[str, Any]:
+        """Ranks ``members``, or every trainer, by their latest value of ``stat``."""
+        rows = []
+        for trainer_id in self.trainers if members is None else members:
+            value = self.latest_value(trainer_id, stat)
+            if value is None:
+                continue
+            data = self.trainers[trainer_id]
+            rows.append(
+                {
+                    "id": trainer_id,
+                    "username": data["username"],
+                    "faction": {"id": data["faction"]},
+                    "value": float(value) if stat == "travel_km" else value,
+                    "level": self.latest_value(trainer_id, "trainer_level"),
+                    "last_updated": self.updates[trainer_id][-1]["update_time"],
+                }
+            )
+        rows.sort(key=lambda row: row["value"], reverse=True)
+
+        position, previous = 0, None
+        for index, row in enumerate(rows, start=1):
+            # Tied trainers share a position, as they do on the real leaderboards
+            if row["value"] != previous:
+                position, previous = index, row["value"]
+            row["position"] = position
+
+        values = [row["value"] for row in rows]
+        return {
+            "generated": datetime.now(timezone.utc).isoformat(),
+            "stat": stat,
+            "title": "Global Leaderboard",
+            "aggregations": {
+                "avg": sum(values) / len(values) if values else 0,
+                "count": len(values),
+                "min": min(values, default=0),
+                "max": max(values, default=0),
+                "sum": sum(values),
+            },
+            "leaderboard": rows,
+            **extra,
+        }
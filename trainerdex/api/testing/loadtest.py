@@ -0,0 +1,212 @@
+"""Pushes concurrent client operations through a :class:`FakeTrainerDexServer`.
+
+    python -m trainerdex.api.testing.loadtest --operations 10000 --concurrency 500
+    python -m trainerdex.api.testing.loadtest --latency 0.01 0.1 --error-rate 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from trainerdex.api.client.base import BaseClient
+from trainerdex.api.http.pool import ConnectionPool
+from trainerdex.api.identity import IdentityMap
+from trainerdex.api.testing.dataset import COMMUNITIES, Dataset
+from trainerdex.api.testing.server import FakeTrainerDexServer
+
+Operation = Callable[[BaseClient, Dataset, random.Random], Awaitable[Any]]
+
+
+def _trainer_id(dataset: Dataset, rng: random.Random) -> int:
+    return rng.randint(1, len(dataset.trainers))
+
+
+async def get_trainer(client: BaseClient, dataset: Dataset, rng: random.Random) -> Any:
+    return await client.get_trainer(_trainer_id(dataset, rng))
+
+
+async def get_user(client: BaseClient, dataset: Dataset, rng: random.Random) -> Any:
+    return await client.get_user(_trainer_id(dataset, rng))
+
+
+async def search_trainer(client: BaseClient, dataset: Dataset, rng: random.Random) -> Any:
+    return await client.search_trainer(dataset.trainers[_trainer_id(dataset, rng)]["username"])
+
+
+async def get_leaderboard(client: BaseClient, dataset: Dataset, rng: random.Random) -> Any:
+    return await client.get_leaderboard(
+        rng.choice(("total_xp", "badge_travel_km", "capture_total"))
+    )
+
+
+async def get_guild_leaderboard(client: BaseClient, dataset: Dataset, rng: random.Random) -> Any:
+    return await client.get_leaderboard(guild=rng.choice(list(dataset.guild_members)))
+
+
+async def get_community_leaderboard(
+    client: BaseClient, dataset: Dataset, rng: random.Random
+) -> Any:
+    return await client.get_leaderboard(community=rng.choice(COMMUNITIES))
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "get_trainer": get_trainer,
+    "get_user": get_user,
+    "search_trainer": search_trainer,
+    "get_leaderboard": get_leaderboard,
+    "get_guild_leaderboard": get_guild_leaderboard,
+    "get_community_leaderboard": get_community_leaderboard,
+}
+DEFAULT_MIX: Dict[str, float] = {
+    "get_trainer": 0.4,
+    "get_user": 0.2,
+    "search_trainer": 0.2,
+    "get_leaderboard": 0.05,
+    "get_guild_leaderboard": 0.1,
+    "get_community_leaderboard": 0.05,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class LoadTestReport:
+    operations: int
+    concurrency: int
+    duration: float
+    latencies: Tuple[float, ...]
+    errors: Dict[str, int]
+    by_operation: Dict[str, int]
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.duration if self.duration else 0.0
+
+    def percentile(self, q: float) -> float:
+        """The latency below which ``q`` of the operations completed, in seconds."""
+        if not self.latencies:
+            return 0.0
+        return self.latencies[min(int(q * len(self.latencies)), len(self.latencies) - 1)]
+
+    def __str__(self) -> str:
+        lines = [
+            f"operations   {self.operations} ({self.concurrency} concurrent)",
+            f"duration     {self.duration:.2f}s",
+            f"throughput   {self.throughput:.1f} ops/s",
+            "latency      "
+            + "  ".join(
+                f"{name} {self.percentile(q) * 1000:.1f}ms"
+                for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+            ),
+            f"errors       {sum(self.errors.values())}",
+        ]
+        lines += [f"  {error:<24} {count}" for error, count in sorted(self.errors.items())]
+        return "\n".join(lines)
+
+
+async def run(
+    client: BaseClient,
+    dataset: Dataset,
+    *,
+    operations: int = 10_000,
+    concurrency: int = 500,
+    mix: Optional[Mapping[str, float]] = None,
+    seed: int = 0,
+) -> LoadTestReport:
+    """Runs ``operations`` randomly chosen client calls, ``concurrency`` at a time.
+
+    ``mix`` weights the names in :data:`OPERATIONS`. Failed calls are counted by exception type
+    rather than stopping the run.
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=operations)
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for name in names:
+        queue.put_nowait(name)
+
+    latencies: List[float] = []
+    errors: Counter[str] = Counter()
+
+    async def worker() -> None:
+        while not queue.empty():
+            operation = OPERATIONS[queue.get_nowait()]
+            started_at = time.perf_counter()
+            try:
+                await operation(client, dataset, rng)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, operations))))
+    return LoadTestReport(
+        operations=operations,
+        concurrency=concurrency,
+        duration=time.perf_counter() - started_at,
+        latencies=tuple(sorted(latencies)),
+        errors=dict(errors),
+        by_operation=dict(Counter(names)),
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    dataset = Dataset.generate(trainers=args.trainers, seed=args.seed)
+    server = FakeTrainerDexServer(
+        dataset,
+        latency=tuple(args.latency) if len(args.latency) == 2 else args.latency[0],
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    async with server:
+        pool = ConnectionPool(limit=args.connections, limit_per_host=args.connections)
+        # Without reuse, so every operation reaches the server
+        identity_map = IdentityMap(maxsize=0)
+        async with server.client(BaseClient, pool=pool, identity_map=identity_map) as client:
+            report = await run(
+                client,
+                dataset,
+                operations=args.operations,
+                concurrency=args.concurrency,
+                seed=args.seed,
+            )
+        await pool.close()
+
+    print(report)
+    print("server responses", dict(sorted(server.statuses.items())))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--operations", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=100, help="the client's pool size")
+    parser.add_argument("--trainers", type=int, default=1_000, help="the size of the dataset")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        nargs="+",
+        default=[0.0],
+        metavar="SECONDS",
+        help="a fixed latency, or a min and max to pick from",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, help="requests per second the server allows")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(_main(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
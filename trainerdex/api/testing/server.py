@@ -0,0 +1,489 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import random
+import secrets
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from aiohttp import web
+from typing_extensions import Self
+
+from trainerdex.api.testing.dataset import Dataset
+
+ClientT = TypeVar("ClientT")
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class FakeTrainerDexServer:
+    """An in-process stand-in for the TrainerDex API, serving a generated :class:`Dataset`.
+
+    It implements every route used by :class:`~trainerdex.api.http.APIV1Mixin`,
+    :class:`~trainerdex.api.http.config_calls.ConfigMixin` and
+    :class:`~trainerdex.api.http.auth.oauth.client_credentials.ClientCredentialsOAuth`, and
+    can be made slow, flaky or stingy to see how a client copes.
+
+    Parameters
+    ----------
+    dataset: Optional[:class:`Dataset`]
+        The data to serve. Defaults to ``Dataset.generate()``.
+    latency: Union[:class:`float`, Tuple[:class:`float`, :class:`float`]]
+        Seconds added to every response, or a ``(min, max)`` range to pick from uniformly.
+    error_rate: :class:`float`
+        The fraction of requests answered with a ``503 Service Unavailable``.
+    throttle_rate: :class:`float`
+        The fraction of requests answered with a ``429 Too Many Requests``.
+    rate_limit: Optional[:class:`int`]
+        Requests allowed per second before answering ``429``. Every response carries
+        ``X-RateLimit-*`` headers while this is set.
+    retry_after: :class:`float`
+        The ``Retry-After`` sent with a ``429``.
+    require_auth: :class:`bool`
+        Whether authenticated routes reject requests without a token.
+    token_lifetime: :class:`int`
+        Seconds until an OAuth token issued by the server expires.
+    filter_updates: :class:`bool`
+        Whether a trainer's update list honours ``update_time__gt``. Without it, every update
+        is sent regardless, like an older server.
+    seed: :class:`int`
+        Seeds the choice of which requests fail, so runs are repeatable.
+
+    Examples
+    --------
+    >>> async with FakeTrainerDexServer(latency=(0.01, 0.05), error_rate=0.01) as server:
+    ...     async with server.client(BaseClient) as client:
+    ...         trainer = await client.get_trainer(1)
+    """
+
+    def __init__(
+        self,
+        dataset: Optional[Dataset] = None,
+        *,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        retry_after: float = 1.0,
+        require_auth: bool = False,
+        token_lifetime: int = 36000,
+        filter_updates: bool = True,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.dataset = dataset or Dataset.generate()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.require_auth = require_auth
+        self.filter_updates = filter_updates
+        self.host = host
+        self.port = port
+
+        self.requests: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self._rng = random.Random(seed)
+        self.token_lifetime = token_lifetime
+        self.tokens_issued = 0
+        self._tokens: Dict[str, float] = {}
+        self._window = (0, 0)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self._add_routes(self.app.router)
+
+    @property
+    def url(self) -> str:
+        if self._runner is None:
+            raise RuntimeError("The server hasn't been started")
+        return f"http://{self.host}:{self.port}/"
+
+    def client(self, cls: Type[ClientT], *args, **kwargs) -> ClientT:
+        """Creates a client of type ``cls`` pointed at this server."""
+        client = cls(*args, **kwargs)
+        client.HOST = self.url
+        return client
+
+    async def start(self) -> Self:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> Self:
+        return await self.start()
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    # Behaviour
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        resource = request.match_info.route.resource
+        self.requests[f"{request.method} {resource.canonical if resource else request.path}"] += 1
+
+        if isinstance(self.latency, tuple):
+            await asyncio.sleep(self._rng.uniform(*self.latency))
+        elif self.latency:
+            await asyncio.sleep(self.latency)
+
+        headers = self._rate_limit_headers()
+        if headers.get("X-RateLimit-Remaining") == "-1" or self._rng.random() < self.throttle_rate:
+            headers["X-RateLimit-Remaining"] = "0"
+            headers["Retry-After"] = str(self.retry_after)
+            response = web.json_response({"detail": "Request was throttled."}, status=429)
+        elif self._rng.random() < self.error_rate:
+            response = web.json_response({"detail": "Service unavailable."}, status=503)
+        else:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                response = web.Response(status=e.status, text=e.text, content_type=e.content_type)
+
+        response.headers.update(headers)
+        self.statuses[response.status] += 1
+        return response
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        if self.rate_limit is None:
+            return {}
+        second = int(time.monotonic())
+        window, count = self._window
+        count = count + 1 if window == second else 1
+        self._window = (second, count)
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(self.rate_limit - count, -1)),
+            "X-RateLimit-Reset": "1",
+        }
+
+    def _check_auth(self, request: web.Request) -> None:
+        if not self.require_auth:
+            return
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme == "Token" and token:
+            return
+        if scheme == "Bearer" and self._valid_token(token):
+            return
+        raise web.HTTPUnauthorized(
+            text='{"detail": "Authentication credentials were not provided."}',
+            content_type="application/json",
+        )
+
+    def _valid_token(self, token: str) -> bool:
+        return self._tokens.get(token, 0) > time.monotonic()
+
+    @staticmethod
+    def _not_found() -> web.HTTPNotFound:
+        return web.HTTPNotFound(text='{"detail": "Not found."}', content_type="application/json")
+
+    def _add_routes(self, router: web.UrlDispatcher) -> None:
+        v1 = "/api/v1"
+        router.add_post("/api/oauth/token/", self.oauth_token)
+        router.add_get("/api/oauth/test/", self.oauth_test)
+
+        router.add_get(v1 + "/trainers/", self.list_trainers)
+        router.add_post(v1 + "/trainers/", self.create_trainer)
+        router.add_get(v1 + r"/trainers/{trainer_id:\d+}/", self.get_trainer)
+        router.add_patch(v1 + r"/trainers/{trainer_id:\d+}/", self.edit_trainer)
+        router.add_get(v1 + r"/trainers/{trainer_id:\d+}/updates/", self.list_updates)
+        router.add_post(v1 + r"/trainers/{trainer_id:\d+}/updates/", self.create_update)
+        router.add_get(v1 + r"/trainers/{trainer_id:\d+}/updates/{uuid}/", self.get_update)
+        router.add_patch(v1 + r"/trainers/{trainer_id:\d+}/updates/{uuid}/", self.edit_update)
+
+        router.add_get(v1 + "/users/", self.list_users)
+        router.add_post(v1 + "/users/", self.create_user)
+        router.add_get(v1 + "/users/social/", self.list_social_connections)
+        router.add_put(v1 + "/users/social/", self.create_social_connection)
+        router.add_get(v1 + r"/users/{user_id:\d+}/", self.get_user)
+
+        for prefix in (
+            "/leaderboard/v1.1/",
+            r"/leaderboard/discord/{guild_id:\d+}/",
+            "/leaderboard/community/{community}/",
+            "/leaderboard/country/{country}/",
+        ):
+            router.add_get(v1 + prefix, self.get_leaderboard)
+            router.add_get(v1 + prefix + "{stat}/", self.get_leaderboard)
+
+        router.add_get("/api/discord/preferences/", self.list_configs)
+        router.add_post("/api/discord/preferences/", self.create_config)
+        router.add_get(r"/api/discord/preferences/{guild_id:\d+}/", self.get_config)
+        router.add_patch(r"/api/discord/preferences/{guild_id:\d+}/", self.edit_config)
+        router.add_delete(r"/api/discord/preferences/{guild_id:\d+}/", self.delete_config)
+
+    # OAuth
+
+    async def oauth_token(self, request: web.Request) -> web.Response:
+        scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+        form = await request.post()
+        try:
+            client_id, _, _ = base64.b64decode(credentials).decode("utf-8").partition(":")
+        except ValueError:
+            client_id = ""
+        if scheme != "Basic" or not client_id or form.get("grant_type") != "client_credentials":
+            return web.json_response({"error": "invalid_client"}, status=401)
+
+        token = secrets.token_urlsafe(24)
+        self._tokens[token] = time.monotonic() + self.token_lifetime
+        self.tokens_issued += 1
+        return web.json_response(
+            {
+                "access_token": token,
+                "expires_in": self.token_lifetime,
+                "token_type": "Bearer",
+                "scope": "read write",
+            }
+        )
+
+    async def oauth_test(self, request: web.Request) -> web.Response:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme == "Bearer" and self._valid_token(token):
+            return web.json_response({"ok": True})
+        return web.json_response({"ok": False}, status=401)
+
+    # Trainers and updates
+
+    def _trainer(self, request: web.Request) -> Dict[str, Any]:
+        trainer = self.dataset.trainers.get(int(request.match_info["trainer_id"]))
+        if trainer is None:
+            raise self._not_found()
+        return trainer
+
+    def _with_update_set(self, trainer: Dict[str, Any]) -> Dict[str, Any]:
+        """The trainer as the API sends it, with a summary of each of their updates."""
+        update_set = [
+            {
+                "uuid": update["uuid"],
+                "trainer": update["trainer"],
+                "update_time": update["update_time"],
+                "xp": None,
+                "trainer_level": update.get("trainer_level"),
+                "total_xp": update.get("total_xp"),
+                "modified_extra_fields": [],
+            }
+            for update in self.dataset.updates.get(trainer["id"], [])
+        ]
+        return {**trainer, "update_set": update_set}
+
+    async def list_trainers(self, request: web.Request) -> web.Response:
+        trainers = self.dataset.trainers.values()
+        if (t := request.query.get("t")) is not None:
+            trainers = [trainer for trainer in trainers if str(trainer["faction"]) == t]
+        if (q := request.query.get("q")) is not None:
+            trainers = [
+                trainer for trainer in trainers if trainer["username"].lower() == q.lower()
+            ]
+        return web.json_response([self._with_update_set(trainer) for trainer in trainers])
+
+    async def get_trainer(self, request: web.Request) -> web.Response:
+        return web.json_response(self._with_update_set(self._trainer(request)))
+
+    async def create_trainer(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        payload = await request.json()
+        owner = self.dataset.users.get(payload.get("owner"))
+        if owner is None:
+            return web.json_response({"owner": ["Invalid user."]}, status=400)
+
+        now = datetime.now(timezone.utc).isoformat()
+        trainer_id = max(self.dataset.trainers, default=0) + 1
+        trainer = {
+            "id": trainer_id,
+            "uuid": str(uuid.uuid4()),
+            "created_at": now,
+            "updated_at": now,
+            "last_modified": now,
+            "has_cheated": False,
+            "currently_banned": False,
+            "username": owner["username"],
+            "last_cheated": None,
+            "daily_goal": None,
+            "total_goal": None,
+            "update_set": [],
+            **payload,
+        }
+        self.dataset.trainers[trainer_id] = trainer
+        self.dataset.updates[trainer_id] = []
+        owner["trainer"] = trainer_id
+        return web.json_response(trainer, status=201)
+
+    async def edit_trainer(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        trainer = self._trainer(request)
+        trainer.update(await request.json())
+        trainer["last_modified"] = datetime.now(timezone.utc).isoformat()
+        return web.json_response(trainer)
+
+    def _update(self, request: web.Request) -> Dict[str, Any]:
+        self._trainer(request)
+        for update in self.dataset.updates[int(request.match_info["trainer_id"])]:
+            if update["uuid"] == request.match_info["uuid"]:
+                return update
+        raise self._not_found()
+
+    async def list_updates(self, request: web.Request) -> web.Response:
+        trainer = self._trainer(request)
+        updates = self.dataset.updates[trainer["id"]]
+        since = request.query.get("update_time__gt")
+        if since is not None and self.filter_updates:
+            since = datetime.fromisoformat(since)
+            updates = [u for u in updates if datetime.fromisoformat(u["update_time"]) > since]
+        return web.json_response(updates)
+
+    async def get_update(self, request: web.Request) -> web.Response:
+        return web.json_response(self._update(request))
+
+    async def create_update(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        trainer = self._trainer(request)
+        update = {
+            "uuid": str(uuid.uuid4()),
+            "update_time": datetime.now(timezone.utc).isoformat(),
+            **await request.json(),
+            "trainer": trainer["id"],
+        }
+        updates = self.dataset.updates[trainer["id"]]
+        updates.append(update)
+        updates.sort(key=lambda u: u["update_time"])
+        return web.json_response(update, status=201)
+
+    async def edit_update(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        update = self._update(request)
+        update.update({k: v for k, v in (await request.json()).items() if v is not None})
+        return web.json_response(update)
+
+    # Users and social connections
+
+    async def list_users(self, request: web.Request) -> web.Response:
+        return web.json_response(list(self.dataset.users.values()))
+
+    async def get_user(self, request: web.Request) -> web.Response:
+        user = self.dataset.users.get(int(request.match_info["user_id"]))
+        if user is None:
+            raise self._not_found()
+        return web.json_response(user)
+
+    async def create_user(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        payload = await request.json()
+        user_id = max(self.dataset.users, default=0) + 1
+        user = {
+            "id": user_id,
+            "uuid": str(uuid.uuid4()),
+            "username": payload["username"],
+            "trainer": None,
+        }
+        self.dataset.users[user_id] = user
+        return web.json_response(user, status=201)
+
+    async def list_social_connections(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        uids = set(request.query.get("uid", "").split(","))
+        provider = request.query.get("provider", "discord")
+        return web.json_response(
+            [
+                connection
+                for connection in self.dataset.social_connections
+                if connection["provider"] == provider and connection["uid"] in uids
+            ]
+        )
+
+    async def create_social_connection(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        payload = await request.json()
+        user = self.dataset.users.get(payload.get("user"))
+        if user is None:
+            return web.json_response({"user": ["Invalid user."]}, status=400)
+        connection = {**payload, "trainer": user["trainer"]}
+        self.dataset.social_connections.append(connection)
+        return web.json_response(connection, status=201)
+
+    # Leaderboards
+
+    async def get_leaderboard(self, request: web.Request) -> web.Response:
+        stat = request.match_info.get("stat", "total_xp")
+        if "guild_id" in request.match_info:
+            guild_id = int(request.match_info["guild_id"])
+            members = self.dataset.guild_members.get(guild_id, [])
+            return web.json_response(
+                self.dataset.leaderboard(
+                    stat, members, guild=guild_id, title=f"{guild_id} Leaderboard"
+                )
+            )
+        if "community" in request.match_info:
+            community = request.match_info["community"]
+            members = self.dataset.communities.get(community, [])
+            return web.json_response(
+                self.dataset.leaderboard(
+                    stat, members, community=community, title=f"{community} Leaderboard"
+                )
+            )
+        if "country" in request.match_info:
+            country = request.match_info["country"]
+            members = self.dataset.countries.get(country, [])
+            return web.json_response(
+                self.dataset.leaderboard(
+                    stat, members, country=country, title=f"{country} Leaderboard"
+                )
+            )
+        return web.json_response(self.dataset.leaderboard(stat))
+
+    # Discord guild preferences
+
+    def _config(self, request: web.Request) -> Dict[str, Any]:
+        config = self.dataset.configs.get(int(request.match_info["guild_id"]))
+        if config is None:
+            raise self._not_found()
+        return config
+
+    async def list_configs(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        return web.json_response(list(self.dataset.configs.values()))
+
+    async def get_config(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        return web.json_response(self._config(request))
+
+    async def create_config(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        payload = await request.json()
+        self.dataset.configs[payload["id"]] = payload
+        return web.json_response(payload, status=201)
+
+    async def edit_config(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        config = self._config(request)
+        config.update(await request.json())
+        return web.json_response(config)
+
+    async def delete_config(self, request: web.Request) -> web.Response:
+        self._check_auth(request)
+        config = self._config(request)
+        del self.dataset.configs[config["id"]]
+        return web.Response(status=204)
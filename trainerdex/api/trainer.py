@@ -2,90 +2,160 @@ from __future__ import annotations
 
 import datetime
 import re
-from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Union
 from uuid import UUID as _UUID
 
-from dateutil.parser import parse
-
 from trainerdex.api.base import BaseClass, UUIDMixin
 from trainerdex.api.faction import Faction
+from trainerdex.api.history import SyncResult, UpdateHistory
 from trainerdex.api.types.v1.update import CreateUpdate
 from trainerdex.api.types.v1.update import Update as StatsPayload
 from trainerdex.api.update import Update
-from trainerdex.api.utils import convert
+from trainerdex.api.utils import LazyTimestamp, convert, parse_datetime
 
 if TYPE_CHECKING:
     from trainerdex.api.types.v1.trainer import ReadTrainer
+    from trainerdex.api.types.v1.update import PartialUpdate
 
-parse_dt = convert(parse)
 UUID = convert(_UUID)
+_MIN = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
 
 
 class Trainer(BaseClass, UUIDMixin):
+    _updates: UpdateHistory = UpdateHistory()
+    _updates_loaded: bool = False
+
+    created_at = LazyTimestamp()
+    updated_at = LazyTimestamp()
+    last_modified = LazyTimestamp()
+    start_date = LazyTimestamp(date=True)
+    last_cheated = LazyTimestamp()
+
     def _update(self, data: ReadTrainer) -> None:
         self.id = data["id"]
         self.uuid = UUID(data["uuid"])
-        self.created_at = parse_dt(data["created_at"])
-        self.updated_at = parse_dt(data["updated_at"])
-        self.last_modified = parse_dt(data["last_modified"])
+        self._created_at = data["created_at"]
+        self._updated_at = data["updated_at"]
+        self._last_modified = data["last_modified"]
         self.username = data["username"]
         self.user_id = data["owner"]
-        self.start_date = None
-        if data["start_date"]:
-            start_datetime = parse_dt(data["start_date"])
-            if start_datetime is not None:
-                self.start_date = start_datetime.date()
-
+        self._start_date = data["start_date"] or None
         self.faction = data["faction"]
         self.trainer_code = data["trainer_code"]
-        self.last_cheated = parse_dt(data["last_cheated"])
+        self._last_cheated = data["last_cheated"]
         self.daily_goal = data["daily_goal"]
         self.total_goal = data["total_goal"]
         self.verified = data["verified"]
         self.statistics = data["statistics"]
-        self._updates = []
-        self._user = None
 
     @property
     def team(self) -> Faction:
         return Faction(self.faction)
 
-    async def fetch_updates(self) -> None:
-        data = await self.client._v1_get_updates_for_trainer(self.id)
-        if data:
-            self._updates = [Update(self.client, update) for update in data]
+    async def fetch_updates(self, *, incremental: bool = False) -> SyncResult:
+        """|coro|
+
+        Fetches the trainer's updates and merges them into :attr:`updates`.
+
+        Updates which are already known keep their objects, and are only updated in place if
+        they've been edited. With ``incremental``, only updates newer than the latest known one
+        are requested. If the server doesn't support that filter and sends every update anyway,
+        they're merged as in a full fetch. The summary of the latest update which the trainer
+        record carries is replaced by the full update.
+
+        Returns
+        -------
+        :class:`~trainerdex.api.history.SyncResult`
+            The updates which were added, changed or removed.
+        """
+        history = self._updates if self._updates_loaded else UpdateHistory()
+        since = history.latest.update_time if incremental and history else None
+        data = await self.client._v1_get_updates_for_trainer(self.id, since=since) or []
+        incremental = since is not None and not any(
+            update_time is None or update_time <= since
+            for update_time in (convert(parse_datetime, update["update_time"]) for update in data)
+        )
+
+        added, changed, seen = [], [], set()
+        for item in data:
+            uuid = UUID(item["uuid"])
+            update = history.get(uuid)
+            if update is None:
+                update = self.client._load(Update, uuid, item)
+                added.append(update)
+            elif not update.matches(item):
+                update._update(item)
+                changed.append(update)
+            seen.add(id(update))
+        removed = () if incremental else [update for update in history if id(update) not in seen]
+
+        result = SyncResult(tuple(added), tuple(changed), tuple(removed), incremental)
+        if result or history is not self._updates:
+            self._updates = history.merged(added, removed)
+        self._updates_loaded = True
+        return result
+
+    def _use_update_set(self, update_set: Optional[List[PartialUpdate]]) -> None:
+        """Stands in the latest of the update summaries sent with the trainer for the history,
+        until it's fetched."""
+        if self._updates_loaded or not update_set:
+            return
+        data = max(update_set, key=lambda u: convert(parse_datetime, u["update_time"]) or _MIN)
+        uuid = UUID(data["uuid"])
+        # An update already in memory holds more than the summary
+        update = self.client.identity_map.peek(Update, uuid) or self.client._load(
+            Update, uuid, data
+        )
+        self._updates = UpdateHistory((update,))
 
     @property
-    def updates(self) -> List[Update]:
-        return self._updates.copy()
+    def updates(self) -> UpdateHistory:
+        """The trainer's updates, oldest first.
 
-    async def get_latest_update(self) -> Union[Update, None]:
-        if not self.updates:
+        Only what's been loaded is here. Unless the client loads updates eagerly, that's nothing,
+        or just a summary of the latest update, until :meth:`get_updates` or
+        :meth:`fetch_updates` is awaited.
+        """
+        return self._updates
+
+    @property
+    def updates_loaded(self) -> bool:
+        """Whether the full update history has been fetched."""
+        return self._updates_loaded
+
+    async def get_updates(self) -> UpdateHistory:
+        """|coro|
+
+        Returns :attr:`updates`, fetching them first if they haven't been.
+        """
+        if not self._updates_loaded:
             await self.fetch_updates()
 
-        if not self.updates:  # still
-            return None
+        return self._updates
 
-        return max(self.updates, key=lambda x: x.update_time)
+    async def get_latest_update(self) -> Union[Update, None]:
+        """|coro|
 
-    async def get_level(self) -> Union[int, None]:
-        if not self.updates:
+        Returns the latest update, fetching the history first if nothing's been loaded. With
+        only the summary from the trainer record loaded, the update holds just ``total_xp`` and
+        ``trainer_level``.
+        """
+        if not self._updates_loaded and not self._updates:
             await self.fetch_updates()
 
-        subset = [update for update in self.updates if update.trainer_level]
-        if not subset:
-            return None
+        return self._updates.latest
 
-        return max(subset, key=lambda x: x.update_time).trainer_level
+    async def get_level(self) -> Union[int, None]:
+        if not self._updates_loaded and not self._updates:
+            await self.fetch_updates()
 
-    async def get_user(self):
-        if self._user is None:
-            self._user = await self.client.get_user(self.user_id)
+        return self._updates.latest_value("trainer_level") or None
 
-        return self._user
+    async def get_user(self):
+        return await self.client.get_user(self.user_id)
 
     async def refresh_from_api(self) -> None:
-        data = await self.client.get_trainer(self.old_id)
+        data = await self.client._v1_get_trainer(self.id)
         self._update(data)
 
     async def edit(self, **payload) -> None:
@@ -152,5 +222,4 @@ class Trainer(BaseClass, UUIDMixin):
             payload["update_time"] = update_time.isoformat()
 
         data = await self.client._v1_create_update(self.id, payload)
-        result = Update(self.client, data)
-        return result
+        return self.client._load(Update, UUID(data["uuid"]), data)
@@ -1,108 +1,168 @@
 from __future__ import annotations
 
 import datetime
+import sys
+import weakref
 from decimal import Decimal as _Decimal
-from typing import TYPE_CHECKING
+from functools import partial
+from itertools import compress
+from operator import is_not
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 from uuid import UUID as _UUID
 
-from dateutil.parser import parse
-
 from trainerdex.api.base import BaseClass, UUIDMixin
-from trainerdex.api.utils import convert
+from trainerdex.api.types.v1.update import Update as StatsPayload
+from trainerdex.api.utils import LazyTimestamp, convert, parse_datetime
 
 if TYPE_CHECKING:
+    from trainerdex.api.history import UpdateHistory
     from trainerdex.api.types.v1.update import ReadUpdate
 
-parse_dt = convert(parse)
 UUID = convert(_UUID)
 Decimal = convert(_Decimal)
 
+# Every stat an update may hold, in schema order. travel_km is kept apart, as it's a Decimal.
+STAT_FIELDS: Tuple[str, ...] = tuple(
+    name for name in StatsPayload.__annotations__ if name != "travel_km"
+)
+_STAT_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(STAT_FIELDS)}
+_is_present = partial(is_not, None)
+
+
+def _pack(data: Dict[str, Any]) -> Tuple[int, Tuple[Any, ...]]:
+    """Packs the stats in ``data`` into an :class:`Update`'s ``_present`` and ``_values``."""
+    names = [name for name in STAT_FIELDS if name in data]
+    values = tuple(map(data.__getitem__, names))
+    if None in values:
+        present = tuple(map(_is_present, values))
+        names = compress(names, present)
+        values = tuple(compress(values, present))
+    return sum(map(_STAT_BITS.__getitem__, names)), values
+
+
+class _Stat:
+    """Reads one stat from an :class:`Update`'s packed storage.
+
+    An update only stores the stats it has. ``_present`` has a bit set for each, in
+    :data:`STAT_FIELDS` order, and ``_values`` holds their values in the same order, so a stat's
+    position is the number of bits set below its own.
+    """
+
+    __slots__ = ("name", "bit", "below")
+
+    def __init__(self, name: str, bit: int) -> None:
+        self.name = name
+        self.bit = bit
+        self.below = bit - 1
+
+    def __get__(self, instance: Optional[Update], owner: type) -> Any:
+        if instance is None:
+            return self
+        present = instance._present
+        if present & self.bit:
+            return instance._values[(present & self.below).bit_count()]
+        return None
+
+    def __set__(self, instance: Update, value: Any) -> None:
+        stats = instance.stats
+        if value is None:
+            stats.pop(self.name, None)
+        else:
+            stats[self.name] = value
+        instance._present, instance._values = _pack(stats)
+        instance._changed()
+
 
 class Update(BaseClass, UUIDMixin):
+    """A snapshot of a trainer's stats at a point in time.
+
+    Stats the update doesn't include read as ``None`` and take up no space, which keeps a full
+    update history small. Stat attributes are generated from
+    :class:`~trainerdex.api.types.v1.update.Update`, one for each field.
+    """
+
+    __slots__ = (
+        "client",
+        "uuid",
+        "trainer_id",
+        "_update_time",
+        "travel_km",
+        "data_source",
+        "_present",
+        "_values",
+        "_histories",
+        "__weakref__",
+    )
+
+    update_time = LazyTimestamp()
+
     def _update(self, data: ReadUpdate) -> None:
+        if hasattr(self, "_present"):
+            previous = self._indexed()
+        else:
+            previous = self._histories = None
         self.uuid = UUID(data["uuid"])
         self.trainer_id = data["trainer"]
-        self.update_time = parse_dt(data["update_time"])
-        self.total_xp = data.get("total_xp")
-        self.trainer_level = data.get("trainer_level")
-        self.pokedex_caught = data.get("pokedex_caught")
-        self.pokedex_seen = data.get("pokedex_seen")
-        self.gymbadges_gold = data.get("gymbadges_gold")
-        self.gym_gold = data.get("gym_gold")
+        self._update_time = data["update_time"]
         self.travel_km = Decimal(data.get("travel_km"))
-        self.pokedex_entries = data.get("pokedex_entries")
-        self.capture_total = data.get("capture_total")
-        self.evolved_total = data.get("evolved_total")
-        self.hatched_total = data.get("hatched_total")
-        self.pokestops_visited = data.get("pokestops_visited")
-        self.unique_pokestops = data.get("unique_pokestops")
-        self.big_magikarp = data.get("big_magikarp")
-        self.battle_attack_won = data.get("battle_attack_won")
-        self.battle_training_won = data.get("battle_training_won")
-        self.small_rattata = data.get("small_rattata")
-        self.pikachu = data.get("pikachu")
-        self.unown = data.get("unown")
-        self.pokedex_entries_gen2 = data.get("pokedex_entries_gen2")
-        self.raid_battle_won = data.get("raid_battle_won")
-        self.legendary_battle_won = data.get("legendary_battle_won")
-        self.berries_fed = data.get("berries_fed")
-        self.hours_defended = data.get("hours_defended")
-        self.pokedex_entries_gen3 = data.get("pokedex_entries_gen3")
-        self.challenge_quests = data.get("challenge_quests")
-        self.max_level_friends = data.get("max_level_friends")
-        self.trading = data.get("trading")
-        self.trading_distance = data.get("trading_distance")
-        self.pokedex_entries_gen4 = data.get("pokedex_entries_gen4")
-        self.great_league = data.get("great_league")
-        self.ultra_league = data.get("ultra_league")
-        self.master_league = data.get("master_league")
-        self.photobomb = data.get("photobomb")
-        self.pokedex_entries_gen5 = data.get("pokedex_entries_gen5")
-        self.pokemon_purified = data.get("pokemon_purified")
-        self.rocket_grunts_defeated = data.get("rocket_grunts_defeated")
-        self.rocket_giovanni_defeated = data.get("rocket_giovanni_defeated")
-        self.buddy_best = data.get("buddy_best")
-        self.pokedex_entries_gen6 = data.get("pokedex_entries_gen6")
-        self.pokedex_entries_gen7 = data.get("pokedex_entries_gen7")
-        self.pokedex_entries_gen8 = data.get("pokedex_entries_gen8")
-        self.seven_day_streaks = data.get("seven_day_streaks")
-        self.unique_raid_bosses_defeated = data.get("unique_raid_bosses_defeated")
-        self.raids_with_friends = data.get("raids_with_friends")
-        self.pokemon_caught_at_your_lures = data.get("pokemon_caught_at_your_lures")
-        self.wayfarer = data.get("wayfarer")
-        self.total_mega_evos = data.get("total_mega_evos")
-        self.unique_mega_evos = data.get("unique_mega_evos")
-        self.trainers_referred = data.get("trainers_referred")
-        self.mvt = data.get("mvt")
-        self.battle_hub_stats_wins = data.get("battle_hub_stats_wins")
-        self.battle_hub_stats_battles = data.get("battle_hub_stats_battles")
-        self.battle_hub_stats_stardust = data.get("battle_hub_stats_stardust")
-        self.battle_hub_stats_streak = data.get("battle_hub_stats_streak")
-        self.type_normal = data.get("type_normal")
-        self.type_fighting = data.get("type_fighting")
-        self.type_flying = data.get("type_flying")
-        self.type_poison = data.get("type_poison")
-        self.type_ground = data.get("type_ground")
-        self.type_rock = data.get("type_rock")
-        self.type_bug = data.get("type_bug")
-        self.type_ghost = data.get("type_ghost")
-        self.type_steel = data.get("type_steel")
-        self.type_fire = data.get("type_fire")
-        self.type_water = data.get("type_water")
-        self.type_grass = data.get("type_grass")
-        self.type_electric = data.get("type_electric")
-        self.type_psychic = data.get("type_psychic")
-        self.type_ice = data.get("type_ice")
-        self.type_dragon = data.get("type_dragon")
-        self.type_dark = data.get("type_dark")
-        self.type_fairy = data.get("type_fairy")
-        self.data_source = data["data_source"]
+        # Absent from the summaries sent with a trainer
+        data_source = data.get("data_source")
+        self.data_source = sys.intern(data_source) if data_source is not None else None
+        self._present, self._values = _pack(data)
+        if previous is not None and previous != self._indexed():
+            self._changed()
 
-    async def get_trainer(self):
-        if getattr(self, "_trainer", None) is None:
-            self._trainer = await self.client.get_trainer(self.trainer_id)
+    def _held_by(self, history: weakref.ref[UpdateHistory]) -> None:
+        """Registers a history to be told when this update changes.
 
-        return self._trainer
+        Most updates are only ever in one live history, so a lone reference is kept as it is.
+        """
+        histories = self._histories
+        if isinstance(histories, list):
+            histories[:] = [ref for ref in histories if ref() is not None]
+            histories.append(history)
+        elif histories is None or histories() is None:
+            self._histories = history
+        else:
+            self._histories = [histories, history]
+
+    def _changed(self) -> None:
+        histories = self._histories
+        for ref in histories if isinstance(histories, list) else (histories,):
+            history = ref() if ref is not None else None
+            if history is not None:
+                history._invalidate()
+
+    def _indexed(self) -> Tuple[Any, ...]:
+        """What an :class:`~trainerdex.api.history.UpdateHistory` indexes this update by."""
+        return self._update_time, self.travel_km, self._present, self._values
+
+    def matches(self, data: ReadUpdate) -> bool:
+        """Whether ``data`` holds the same update time, source and stats as this update."""
+        if (self._present, self._values) != _pack(data):
+            return False
+        if self.data_source != data.get("data_source") or self.trainer_id != data["trainer"]:
+            return False
+        if self.travel_km != Decimal(data.get("travel_km")):
+            return False
+        update_time = data["update_time"]
+        return self._update_time == update_time or self.update_time == convert(
+            parse_datetime, update_time
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """The stats this update includes, in schema order."""
+        present = self._present
+        stats = dict(
+            zip((name for name in STAT_FIELDS if present & _STAT_BITS[name]), self._values)
+        )
+        if self.travel_km is not None:
+            stats["travel_km"] = self.travel_km
+        return stats
+
+    async def get_trainer(self):
+        return await self.client.get_trainer(self.trainer_id)
 
     async def refresh_from_api(self) -> None:
         data = await self.client._v1_get_update(self.trainer_id, self.uuid)
@@ -127,3 +187,8 @@ class Update(BaseClass, UUIDMixin):
 
         new_data = await self.client._v1_edit_update(self.trainer_id, self.uuid, payload)
         self._update(new_data)
+
+
+for _name in STAT_FIELDS:
+    setattr(Update, _name, _Stat(_name, _STAT_BITS[_name]))
+del _name
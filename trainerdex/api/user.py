@@ -20,10 +20,7 @@ class User(BaseClass, UUIDMixin):
         self.trainer_id = data["trainer"]
 
     async def get_trainer(self) -> Trainer:
-        if not self._trainer:
-            self._trainer = await self.client.get_trainer(self.trainer_id)
-
-        return self._trainer
+        return await self.client.get_trainer(self.trainer_id)
 
     async def refresh_from_api(self) -> None:
         data = await self.client._v1_get_user(self.id)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import datetime
+import sys
 from functools import wraps
+from importlib import import_module
 from inspect import isawaitable
 from typing import (
     Any,
     Callable,
+    List,
+    Mapping,
     ParamSpec,
     Protocol,
+    Tuple,
     TypeVar,
     Union,
     overload,
@@ -63,6 +69,84 @@ async def maybe_coroutine(f, *args, **kwargs):
         return value
 
 
+def parse_datetime(value: str) -> datetime.datetime:
+    """Parses an ISO 8601 timestamp, as sent by the API.
+
+    Anything :meth:`datetime.datetime.fromisoformat` can't read is handed to
+    :func:`dateutil.parser.parse`, which is imported on first use.
+    """
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        from dateutil.parser import parse
+
+        return parse(value)
+
+
+class LazyTimestamp:
+    """A model attribute which holds a timestamp as received, and parses it when first read.
+
+    The string is kept in the attribute of the same name with a leading underscore, which
+    could be a slot, and replaced there by the parsed value. A timestamp which can't be parsed
+    raises the parser's :class:`ValueError` each time it's read. With ``date``, only the date
+    is kept.
+
+    Examples
+    --------
+    >>> class Model(BaseClass):
+    ...     created_at = LazyTimestamp()
+    ...
+    ...     def _update(self, data):
+    ...         self._created_at = data["created_at"]
+    """
+
+    __slots__ = ("attr", "date")
+
+    def __init__(self, *, date: bool = False) -> None:
+        self.date = date
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.attr = f"_{name}"
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        value = getattr(instance, self.attr)
+        if isinstance(value, str):
+            value = parse_datetime(value)
+            if self.date:
+                value = value.date()
+            setattr(instance, self.attr, value)
+        return value
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        setattr(instance, self.attr, value)
+
+
+def lazy_exports(
+    package: str, exports: Mapping[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Builds a module ``__getattr__`` and ``__dir__`` which import names on first access.
+
+    ``exports`` maps each name to the submodule, relative to ``package``, which defines it. This
+    keeps importing a package cheap when only some of what it exports is used.
+    """
+
+    def __getattr__(name: str) -> Any:
+        try:
+            module = exports[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        value = getattr(import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return __getattr__, __dir__
+
+
 @runtime_checkable
 class HasID(Protocol):
     id: int